@@ -0,0 +1,58 @@
+"""Micro-benchmark: Telegramm-Kodierung (``_build_message``).
+
+Vergleicht die gecachte Kodierung aus ``telegram.py`` mit der früheren
+Listen-/Generator-Variante (unten als ``legacy_build`` konserviert) für
+Polls über alle Kanäle und Fahrbefehle.
+
+    python benchmarks/bench_encoder.py [--number 200000]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "custom_components"))
+
+from warema_webcontrol.webcontrol_client import WebControlProtocol  # noqa: E402
+
+
+def legacy_build(counter: int, payload: List[int]) -> str:
+    """Kodierung vor ``telegram.py`` (nur zum Vergleich)."""
+    full = [WebControlProtocol.BEFEHLSCODE, counter, len(payload)] + payload
+    return ''.join(f'{b & 0xFF:02x}' for b in full)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200000)
+    args = parser.parse_args()
+
+    proto = WebControlProtocol("http://bench.invalid")
+    payloads = [[proto.TEL_POLLING, r, k, 0] for r in range(8) for k in range(5)]
+    payloads += [proto._channel_payload(r, k, proto.FC_STATE, 50, proto.INVALID_WINKEL) for r in range(8) for k in range(5)]
+    for i, payload in enumerate(payloads):
+        assert proto._build_message(payload)[0] == legacy_build(i % 255, payload), payload
+
+    n = len(payloads)
+    state = {"i": 0}
+
+    def new() -> None:
+        state["i"] += 1
+        proto._build_message(payloads[state["i"] % n])
+
+    def old() -> None:
+        state["i"] += 1
+        legacy_build(state["i"] % 255, payloads[state["i"] % n])
+
+    t_old = timeit.timeit(old, number=args.number)
+    t_new = timeit.timeit(new, number=args.number)
+    print(f"legacy   {t_old / args.number * 1e6:8.3f} µs/Telegramm")
+    print(f"cached   {t_new / args.number * 1e6:8.3f} µs/Telegramm   ({t_old / t_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Micro-benchmark: XML-Auswertung der Gateway-Antworten.
+
+Vergleicht ``WebControlProtocol._parse_xml_response`` mit dem früheren
+findall-basierten Parser (unten als ``legacy_parse`` konserviert) auf den
+Antworten in ``benchmarks/responses``.
+
+    python benchmarks/bench_parser.py [--number 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "custom_components"))
+
+from warema_webcontrol.webcontrol_client import WebControlProtocol  # noqa: E402
+
+# Antwortdatei -> Request-Telegramm, das sie ausgelöst hat
+RESPONSES = {
+    "polling.xml": WebControlProtocol.TEL_POLLING,
+    "kanalbedienung.xml": WebControlProtocol.TEL_KANALBEDIENUNG,
+    "busy.xml": WebControlProtocol.TEL_KANALBEDIENUNG,
+    "kanal_abfragen.xml": WebControlProtocol.TEL_CLIMATRONIC_KANAL_ABFRAGEN,
+    "raum_abfragen.xml": WebControlProtocol.TEL_RAUM_ABFRAGEN,
+}
+
+
+def legacy_parse(xml_text: str) -> dict:
+    """Parser vor der Umstellung auf Antwortschemas (nur zum Vergleich)."""
+    try:
+        root = ET.fromstring(xml_text)
+    except ET.ParseError as e:
+        return {"ok": False, "error": f"xml_parse_error: {e}"}
+
+    def get_tag(*names: str):
+        for n in names:
+            el = root.findall(n)
+            ed = []
+            for e in el:
+                if e is not None and e.text is not None:
+                    ed.append(e.text.strip())
+            if ed is not None:
+                return ed if len(ed) != 1 else ed[0]
+        return None
+
+    xml_tags = {"responseID", "befehlszaehler", "requestid", "feedback", "raumindex",
+                "kanalindex", "lastp", "lastw", "raumname", "clikanalindex", "cliausl",
+                "erfolg", "sprache", "winterakt", "maxw", "minw", "produkttyp",
+                "kanalname", "winakt"}
+
+    result = {"ok": True}
+    for xml_tag in xml_tags:
+        tag = get_tag(xml_tag)
+        if tag is not None:
+            if isinstance(tag, list):
+                for t in tag:
+                    try:
+                        if xml_tag not in {"kanalname", "raumname"}:
+                            result.setdefault(xml_tag, []).append(int(t))
+                        else:
+                            result.setdefault(xml_tag, []).append(t.strip())
+                    except Exception:
+                        result.setdefault(xml_tag, []).append(None)
+            else:
+                try:
+                    if xml_tag not in {"kanalname", "raumname"}:
+                        result[xml_tag] = int(tag)
+                    else:
+                        result[xml_tag] = tag.strip()
+                except Exception:
+                    result[xml_tag] = None
+        else:
+            result[xml_tag] = None
+    if result.get("responseID") is None or result.get("befehlszaehler") is None:
+        result["ok"] = False
+    if result.get("responseID") == WebControlProtocol.RES_CLIMA_COM_BUSY:
+        result["busy"] = True
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="Aufrufe je Antwort")
+    args = parser.parse_args()
+
+    proto = WebControlProtocol("http://bench")
+    print(f"{'response':<22}{'legacy µs':>12}{'schema µs':>12}{'speedup':>10}")
+    for name, tel in RESPONSES.items():
+        text = (ROOT / "responses" / name).read_text(encoding="utf-8")
+        legacy = min(timeit.repeat(lambda: legacy_parse(text), number=args.number, repeat=3))
+        schema = min(timeit.repeat(lambda: proto._parse_xml_response(text, tel), number=args.number, repeat=3))
+        legacy_us = legacy / args.number * 1e6
+        schema_us = schema / args.number * 1e6
+        print(f"{name:<22}{legacy_us:>12.2f}{schema_us:>12.2f}{legacy_us / schema_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""End-to-end-Benchmark des Protokoll-Stacks gegen den Gateway-Simulator.
+
+Misst für ``AsyncWebControlClient``:
+- Dauer eines vollständigen ``initialize`` (Kanal- und Raumscan)
+- Telegramme/s bei Polling-Runden über alle Kanäle
+- Latenz von Fahrbefehlen (``cover_set_position``) als p50/p99
+
+    python benchmarks/bench_protocol.py --rooms 10 --channels-per-room 5 --latency 0.02
+    python benchmarks/bench_protocol.py --busy-rate 0.1 --json > bench_output.txt
+    python benchmarks/bench_protocol.py --capture /tmp/sim.jsonl.gz   # Mitschnitt für replay_capture.py
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT.parent / "custom_components"))
+
+from gateway_simulator import GatewaySimulator, add_config_arguments, config_from_args, start_in_thread  # noqa: E402
+from warema_webcontrol.async_client import AsyncWebControlClient  # noqa: E402
+from warema_webcontrol.capture import CaptureWriter  # noqa: E402
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, float]:
+    sim = GatewaySimulator(config_from_args(args))
+    server, base_url = start_in_thread(sim)
+    results: Dict[str, float] = {}
+    try:
+        async with aiohttp.ClientSession() as session:
+            client = AsyncWebControlClient(base_url, session)
+            if args.capture:
+                client.capture = CaptureWriter(args.capture, base_url)
+
+            start = time.perf_counter()
+            init = await client.initialize(144)
+            results["initialize_s"] = time.perf_counter() - start
+            results["initialize_telegrams"] = sim.requests
+
+            channels = init["channels_mapped"]["cover"] + init["channels_mapped"]["light"]
+            results["channels"] = len(channels)
+
+            sent = sim.requests
+            start = time.perf_counter()
+            for _ in range(args.poll_rounds):
+                for ch in channels:
+                    await client.poll(ch.raumindex, ch.kanalindex)
+            elapsed = time.perf_counter() - start
+            results["poll_telegrams_per_s"] = (sim.requests - sent) / elapsed if elapsed else 0.0
+
+            # Vollständige Zustandsrunde per Blockabfrage (Bulk-Refresh des Coordinators)
+            size = client.CLIMA_BLOCK_SIZE
+            starts = sorted({ch.cli_index - ch.cli_index % size for ch in channels})
+            sent = sim.requests
+            start = time.perf_counter()
+            for _ in range(args.poll_rounds):
+                for block in starts:
+                    await client.poll_block(block)
+            elapsed = time.perf_counter() - start
+            results["refresh_round_telegrams_poll"] = len(channels)
+            results["refresh_round_telegrams_block"] = (sim.requests - sent) / args.poll_rounds if args.poll_rounds else 0.0
+            results["refresh_round_block_ms"] = elapsed / args.poll_rounds * 1000 if args.poll_rounds else 0.0
+
+            covers = init["channels_mapped"]["cover"]
+            rng = random.Random(args.seed)
+            latencies: List[float] = []
+            for _ in range(args.commands if covers else 0):
+                ch = rng.choice(covers)
+                start = time.perf_counter()
+                await client.cover_set_position(ch, rng.randint(0, 100))
+                latencies.append(time.perf_counter() - start)
+            results["command_p50_ms"] = percentile(latencies, 50) * 1000
+            results["command_p99_ms"] = percentile(latencies, 99) * 1000
+            results["busy_injected"] = sim.busy_sent
+            results["mismatches_injected"] = sim.mismatches_sent
+            results["telegrams_total"] = sim.requests
+            if client.capture is not None:
+                client.capture.close()
+    finally:
+        server.shutdown()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_config_arguments(parser)
+    parser.add_argument("--poll-rounds", type=int, default=5, help="Polling-Runden über alle Kanäle")
+    parser.add_argument("--commands", type=int, default=50, help="Anzahl Fahrbefehle für die Latenzmessung")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    parser.add_argument("--capture", metavar="PATH", help="Telegramme mitschneiden (.jsonl oder .jsonl.gz)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, sort_keys=True))
+        return
+    width = max(len(k) for k in results)
+    for key, value in results.items():
+        print(f"{key:<{width}}  {value:10.2f}" if isinstance(value, float) else f"{key:<{width}}  {value:10d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Lokaler Stand-in für das Climatronic/WebControl-Gateway.
+
+Beantwortet ``/protocol.xml?protocol=<hex>`` wie das echte Gateway (soweit
+von der Integration genutzt) und simuliert fahrende Behänge. Latenz,
+``RES_CLIMA_COM_BUSY`` und falsche Befehlszähler lassen sich einstellen.
+
+    python benchmarks/gateway_simulator.py --port 8080 --rooms 8 --channels-per-room 5
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+# Telegramm-/Antwortcodes (siehe WebControlProtocol)
+TEL_RAUM_ABFRAGEN = 3
+TEL_KANALBEDIENUNG = 29
+TEL_AUTOMATIK = 37
+TEL_POLLING = 39
+TEL_SPRACHE = 51
+TEL_CLIMATRONIC_KANAL_ABFRAGEN = 59
+TEL_CHECK_CLIMA_DATA = 61
+TEL_ABWESEND = 63
+TEL_SOMMER_WINTER_AKTIV = 71
+TEL_AUSLOESER = 73
+RES_CLIMA_COM_BUSY = 41
+
+FC_STOP = 1
+FC_STATE = 3
+FC_HOCH = 8
+FC_TIEF = 9
+
+TYPE_RAFFSTORE = 2
+TYPE_ROLLLADEN = 3
+TYPE_LICHT = 12
+TYPE_INVALID = 255
+
+
+@dataclass
+class SimChannel:
+    cli_index: int
+    raumindex: int
+    kanalindex: int
+    name: str
+    type: int
+    lastp: float = 0.0
+    lastw: int = 0
+    target: float = 0.0
+    moved_at: float = field(default_factory=time.monotonic)
+    cause: int = 0
+
+    def position(self, speed: float, now: float) -> int:
+        """lastp (0..200) zum Zeitpunkt ``now``, Fahrt mit ``speed`` Einheiten/s."""
+        step = speed * (now - self.moved_at)
+        if self.lastp < self.target:
+            self.lastp = min(self.target, self.lastp + step)
+        elif self.lastp > self.target:
+            self.lastp = max(self.target, self.lastp - step)
+        self.moved_at = now
+        return int(self.lastp)
+
+
+@dataclass
+class SimConfig:
+    rooms: int = 8
+    channels_per_room: int = 5
+    latency: float = 0.0          # Sekunden je Telegramm
+    busy_rate: float = 0.0        # Wahrscheinlichkeit für RES_CLIMA_COM_BUSY auf Kanalbefehle
+    mismatch_rate: float = 0.0    # Wahrscheinlichkeit für falschen Befehlszähler
+    speed: float = 20.0           # lastp-Einheiten pro Sekunde (200 = komplette Fahrt)
+    seed: Optional[int] = None
+
+
+class GatewaySimulator:
+    """Protokoll-Logik; das Gateway bearbeitet wie das Original ein Telegramm nach dem anderen."""
+
+    def __init__(self, config: SimConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.channels: List[SimChannel] = []
+        self.requests = 0
+        self.busy_sent = 0
+        self.mismatches_sent = 0
+        cli = 0
+        for r in range(config.rooms):
+            for k in range(config.channels_per_room):
+                ctype = TYPE_LICHT if cli % 5 == 4 else (TYPE_RAFFSTORE if cli % 3 == 0 else TYPE_ROLLLADEN)
+                self.channels.append(SimChannel(cli, r, k, f"Kanal {cli}", ctype))
+                cli += 1
+        self._by_room: Dict[Tuple[int, int], SimChannel] = {(c.raumindex, c.kanalindex): c for c in self.channels}
+
+    # ---------- Antworten ----------
+    @staticmethod
+    def _xml(fields: List[Tuple[str, object]]) -> str:
+        body = "".join(f"<{tag}>{escape(str(value))}</{tag}>" for tag, value in fields)
+        return f'<?xml version="1.0" encoding="UTF-8"?><response>{body}</response>'
+
+    def _state_fields(self, ch: Optional[SimChannel], raumindex: int, kanalindex: int) -> List[Tuple[str, object]]:
+        lastp = ch.position(self.config.speed, time.monotonic()) if ch else 0
+        return [("raumindex", raumindex), ("kanalindex", kanalindex),
+                ("lastp", lastp), ("lastw", ch.lastw if ch else 0)]
+
+    def handle(self, hex_string: str) -> str:
+        frame = bytes.fromhex(hex_string)
+        cnt, length = frame[1], frame[2]
+        payload = frame[3:3 + length]
+        tel = payload[0]
+        with self._lock:
+            self.requests += 1
+            if self.config.latency:
+                time.sleep(self.config.latency)
+            if self.config.mismatch_rate and self._rng.random() < self.config.mismatch_rate:
+                self.mismatches_sent += 1
+                cnt = (cnt + 1) % 255
+            header = [("responseID", tel + 1), ("befehlszaehler", cnt)]
+            return self._xml(header + self._answer(tel, payload, header))
+
+    def _answer(self, tel: int, p: bytes, header: List[Tuple[str, object]]) -> List[Tuple[str, object]]:
+        if tel == TEL_POLLING:
+            return self._state_fields(self._by_room.get((p[1], p[2])), p[1], p[2])
+
+        if tel == TEL_KANALBEDIENUNG:
+            ch = self._by_room.get((p[1], p[2]))
+            if ch:
+                self._apply_command(ch, p)
+            if self.config.busy_rate and self._rng.random() < self.config.busy_rate:
+                # Befehl angenommen, Gateway meldet busy -> Client pollt den Kanal
+                self.busy_sent += 1
+                header[0] = ("responseID", RES_CLIMA_COM_BUSY)
+                return [("requestid", TEL_KANALBEDIENUNG), ("feedback", 1)]
+            return self._state_fields(ch, p[1], p[2])
+
+        if tel == TEL_RAUM_ABFRAGEN:
+            r = p[1]
+            if r >= self.config.rooms:
+                return [("raumname", "")]
+            clis = [self._by_room[(r, k)].cli_index if (r, k) in self._by_room else TYPE_INVALID
+                    for k in range(10)]
+            return [("raumname", f"Raum {r}")] + [("clikanalindex", c) for c in clis]
+
+        if tel == TEL_CLIMATRONIC_KANAL_ABFRAGEN:
+            fields: List[Tuple[str, object]] = []
+            for ch in self.channels[p[1]:p[1] + 4]:
+                fields += [("kanalname", ch.name), ("produkttyp", ch.type), ("lastp", ch.position(self.config.speed, time.monotonic())),
+                           ("lastw", ch.lastw), ("maxw", 90 if ch.type == TYPE_RAFFSTORE else 0),
+                           ("minw", -90 if ch.type == TYPE_RAFFSTORE else 0), ("winakt", 0)]
+            return fields
+
+        if tel == TEL_AUSLOESER:
+            ch = self._by_room.get((p[1], p[2]))
+            return [("raumindex", p[1]), ("kanalindex", p[2]), ("clikanidx", p[3]),
+                    ("cliausl", ch.cause if ch else 0)]
+
+        if tel == TEL_SPRACHE:
+            return [("sprache", 0)]
+        if tel == TEL_SOMMER_WINTER_AKTIV:
+            return [("winterakt", 0)]
+        if tel == TEL_CHECK_CLIMA_DATA:
+            return [("erfolg", 1)]
+        # TEL_ABWESEND, TEL_AUTOMATIK: nur Quittung
+        return []
+
+    def _apply_command(self, ch: SimChannel, p: bytes) -> None:
+        fc, pos = p[3], p[4]
+        ch.position(self.config.speed, time.monotonic())
+        if fc == FC_STOP:
+            ch.target = ch.lastp
+        elif fc == FC_HOCH:
+            ch.target = 0
+        elif fc == FC_TIEF:
+            ch.target = 200
+        elif fc == FC_STATE:
+            ch.target = min(200, pos * 2)
+        winkel = (p[5] << 8) | p[6]
+        if winkel != 32767:
+            ch.lastw = winkel - 65536 if winkel > 32767 else winkel
+        ch.cause = 1
+
+
+def make_server(sim: GatewaySimulator, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """HTTP-Server für ``sim``; ``port=0`` wählt einen freien Port (``server.server_address``)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            url = urlparse(self.path)
+            hex_string = parse_qs(url.query).get("protocol", [""])[0]
+            if url.path != "/protocol.xml" or not hex_string:
+                self.send_error(404)
+                return
+            body = sim.handle(hex_string).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/xml; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(sim: GatewaySimulator, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Simulator im Hintergrund-Thread starten; liefert Server und Basis-URL."""
+    server = make_server(sim, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--rooms", type=int, default=SimConfig.rooms)
+    parser.add_argument("--channels-per-room", type=int, default=SimConfig.channels_per_room)
+    parser.add_argument("--latency", type=float, default=SimConfig.latency, help="Sekunden je Telegramm")
+    parser.add_argument("--busy-rate", type=float, default=SimConfig.busy_rate)
+    parser.add_argument("--mismatch-rate", type=float, default=SimConfig.mismatch_rate)
+    parser.add_argument("--speed", type=float, default=SimConfig.speed, help="lastp-Einheiten pro Sekunde")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args: argparse.Namespace) -> SimConfig:
+    return SimConfig(rooms=args.rooms, channels_per_room=args.channels_per_room, latency=args.latency,
+                     busy_rate=args.busy_rate, mismatch_rate=args.mismatch_rate, speed=args.speed,
+                     seed=args.seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    server = make_server(GatewaySimulator(config_from_args(args)), args.host, args.port)
+    print(f"Gateway-Simulator auf http://{args.host}:{args.port}/protocol.xml")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Wiedergabe eines Gateway-Mitschnitts (Dienst ``warema_webcontrol.start_capture``
+oder ``bench_protocol.py --capture``) gegen ``WebControlClient`` ohne Hardware.
+
+Die aufgezeichneten Telegramme werden in Originalreihenfolge über ``_send``
+geschickt; ``ReplayTransport`` beantwortet sie aus dem Mitschnitt (inklusive
+busy-Antworten und Zählerfehlern), so dass Parser, Retry-Logik und Backoff
+mit echten Verkehrsmustern laufen. Wiederholungen, die ``_send`` selbst
+auslöst, verbrauchen die aufgezeichneten Wiederholungen.
+
+    python benchmarks/replay_capture.py capture.jsonl.gz               # Originalgeschwindigkeit
+    python benchmarks/replay_capture.py capture.jsonl.gz --speed 0     # so schnell wie möglich
+    python benchmarks/replay_capture.py capture.jsonl.gz --speed 0 --profile
+"""
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import pstats
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "custom_components"))
+
+from warema_webcontrol.backoff import AdaptiveBackoff  # noqa: E402
+from warema_webcontrol.capture import ReplayTransport, read_capture  # noqa: E402
+from warema_webcontrol.webcontrol_client import WebControlClient  # noqa: E402
+
+
+def replay(path: str, speed: float) -> Dict[str, object]:
+    header, entries = read_capture(path)
+    transport = ReplayTransport(entries, speed=speed)
+    client = WebControlClient(header.get("base_url") or "http://replay.invalid")
+    client.transport = transport
+    # Backoff-Pausen im gleichen Verhältnis beschleunigen wie die Laufzeiten
+    default = AdaptiveBackoff()
+    scale = 1 / speed if speed > 0 else 0.0
+    client.backoff = AdaptiveBackoff(default.min_delay * scale, default.max_delay * scale)
+
+    failures = 0
+    start = time.perf_counter()
+    t0 = entries[0].t if entries else 0.0
+    for idx, entry in enumerate(entries):
+        if transport.used[idx]:
+            continue  # schon als Wiederholung eines vorherigen _send beantwortet
+        if speed > 0:
+            wait = (entry.t - t0) / speed - (time.perf_counter() - start)
+            if wait > 0:
+                time.sleep(wait)
+        payload = list(bytes.fromhex(entry.request)[3:])
+        try:
+            client._send(payload)
+        except (ConnectionError, LookupError):
+            failures += 1
+    elapsed = time.perf_counter() - start
+
+    metrics = client.metrics
+    return {
+        "capture": path,
+        "base_url": header.get("base_url"),
+        "entries": len(entries),
+        "replayed_s": round(elapsed, 3),
+        "captured_s": round(entries[-1].t - t0, 3) if entries else 0.0,
+        "served": transport.served,
+        "skipped": transport.skipped,
+        "missing": transport.missing,
+        "failures": failures,
+        "sent": metrics.sent,
+        "retries": metrics.retries,
+        "busy": metrics.busy,
+        "counter_mismatch": metrics.counter_mismatch,
+        "parse_mean_ms": round(metrics.mean_ms("parse") or 0.0, 4),
+        "telegrams": {name: {"sent": st["sent"], "retries": st["retries"], "parse_p99_ms": st["parse"]["p99_ms"]}
+                      for name, st in metrics.as_dict()["telegrams"].items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", help="Mitschnitt (.jsonl oder .jsonl.gz)")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = Originaltempo, 0 = ohne Wartezeiten")
+    parser.add_argument("--profile", action="store_true", help="cProfile, Top 25 nach kumulierter Zeit")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = parser.parse_args()
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    results = replay(args.capture, args.speed)
+    if profiler:
+        profiler.disable()
+
+    if args.json:
+        print(json.dumps(results, sort_keys=True))
+    else:
+        telegrams = results.pop("telegrams")
+        width = max(len(k) for k in results)
+        for key, value in results.items():
+            print(f"{key:<{width}}  {value}")
+        for name, st in telegrams.items():
+            print(f"  {name:<32} sent={st['sent']:<6} retries={st['retries']:<4} parse_p99_ms={st['parse_p99_ms']}")
+    if profiler:
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,39 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import timedelta
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-
-from .webcontrol_client import WebControlClient, ChannelInfo
-from .const import DOMAIN, CONF_BASE_URL, CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.typing import ConfigType
+
+from .async_client import AsyncWebControlClient
+from .coordinator import WebControlCoordinator
+from .discovery import TopologyWatcher
+from .scheduler import SchedulerHub
+from .services import async_setup_services
+from .stream import StateStream
+from .topology import TopologyCache
+from .webcontrol_client import ChannelInfo
+from .const import (
+    DOMAIN, CONF_BASE_URL, CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL, DATA_SCHEDULER_HUB, DATA_TOPOLOGY_CACHE,
+    CONF_STREAMING, CONF_STREAM_RATE, DEFAULT_STREAM_RATE, CONF_DEFERRED_START, DEFERRED_RETRY_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS = ["cover", "light", "switch", "binary_sensor", "sensor"]
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Dienste der Integration registrieren."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
@@ -20,51 +41,152 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     base_url = entry.data[CONF_BASE_URL]
     scan_seconds = entry.options.get(CONF_SCAN_INTERVAL, entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL))
 
-    client = WebControlClient(base_url=base_url, timeout=5)
-
-
-    # Initialisierung im Threadpool (blockiert sonst)
-    init = await hass.async_add_executor_job(client.initialize, 144)
+    # Geteilter aiohttp-Pool von HA; je Gateway eine eigene Spur im gemeinsamen Scheduler
+    hub: SchedulerHub = hass.data.setdefault(DATA_SCHEDULER_HUB, SchedulerHub())
+    lane_key = base_url.rstrip("/")
+    client = AsyncWebControlClient(base_url=base_url, session=async_get_clientsession(hass), timeout=5,
+                                   scheduler=hub.lane(lane_key))
+    entry.async_on_unload(lambda: hub.release_lane(lane_key))
+
+    # Topologie aus dem Cache: spart den Kanal- (36×) und Raum-Scan (64×) beim Start
+    # eine Instanz für alle Gateways: jede Speicherung schreibt den gemeinsamen Stand
+    topology_cache: TopologyCache = hass.data.setdefault(DATA_TOPOLOGY_CACHE, TopologyCache(hass))
+    cached_topology = await topology_cache.async_load(client.base_url)
+    deferred = entry.options.get(CONF_DEFERRED_START, False)
+    if deferred:
+        # Verzögerter Start: Entities sofort aus dem Cache (ohne Telegramme), Gateway erst im Hintergrund
+        init = client.map_channels(*client.topology_channels(cached_topology or {}))
+    elif cached_topology is not None:
+        init = await client.initialize_from_topology(cached_topology)
+    else:
+        init = await client.initialize(144)
+        await topology_cache.async_save(client.base_url, client.export_topology(init))
 
     mapped = init["channels_mapped"]
     covers: list[ChannelInfo] = mapped.get("cover", [])
     lights: list[ChannelInfo] = mapped.get("light", [])
 
-    async def _async_update():
-        try:
-            # Polling im Threadpool (alle relevanten Channels)
-            def _do_poll():
-                for ch in covers + lights:
-                    if ch.raumindex is not None and ch.kanalindex is not None:
-                        client.poll(ch.raumindex, ch.kanalindex)
-                return client.state_cache
-            return await hass.async_add_executor_job(_do_poll)
-        except Exception as exc:
-            raise UpdateFailed(str(exc)) from exc
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name="webcontrol_coordinator",
-        update_method=_async_update,
-        update_interval=timedelta(seconds=int(scan_seconds)),
-    )
-
-    # Erste Aktualisierung
-    await coordinator.async_config_entry_first_refresh()
-
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN]["client"] = client
-    hass.data[DOMAIN]["mapped"] = mapped
-    hass.data[DOMAIN]["coordinator"] = coordinator
+    coordinator = WebControlCoordinator(hass, client, covers + lights, int(scan_seconds))
+    entry.async_on_unload(client.add_command_listener(coordinator.async_on_channel_command))
+
+    @callback
+    def _async_health_changed(available: bool) -> None:
+        # Gateway wieder erreichbar: sofort pollen statt bis zum nächsten Intervall unavailable zu bleiben
+        if available and not coordinator.streaming:
+            hass.async_create_task(coordinator.async_request_refresh())
+
+    entry.async_on_unload(client.health.add_listener(_async_health_changed))
+
+    # Erste Aktualisierung (auch im Streaming-Modus: Blockabfragen liefern sofort alle Zustände)
+    if deferred:
+        coordinator.async_mark_pending()
+    else:
+        await coordinator.async_config_entry_first_refresh()
+    streaming = entry.options.get(CONF_STREAMING, False)
+    if streaming:
+        coordinator.async_enable_streaming()
+
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        "client": client,
+        "mapped": mapped,
+        "coordinator": coordinator,
+        "device_info": DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer="Warema",
+            configuration_url=client.base_url,
+        ),
+    }
 
     # Plattformen laden
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Neue/geänderte/entfernte Kanäle im Hintergrund erkennen
+    erfolg = cached_topology.get("clima_check_erfolg") if cached_topology is not None else init["clima_check_erfolg"]
+    watcher = TopologyWatcher(hass, entry, client, coordinator, topology_cache, init, erfolg)
+    if deferred:
+        entry.async_create_background_task(
+            hass, _async_deferred_start(client, coordinator, watcher, topology_cache, cached_topology),
+            "warema_webcontrol_deferred_start",
+        )
+    else:
+        watcher.async_start(check_now=cached_topology is not None)
+
+    if streaming:
+        StateStream(hass, entry, client, coordinator,
+                    entry.options.get(CONF_STREAM_RATE, DEFAULT_STREAM_RATE)).async_start()
+
+    # Optionen (Intervall, Streaming, verzögerter Start) greifen nach einem Neuladen
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
     return True
 
 
+async def _async_deferred_start(client: AsyncWebControlClient, coordinator: WebControlCoordinator,
+                                watcher: TopologyWatcher, topology_cache: TopologyCache,
+                                cached_topology: dict | None) -> None:
+    """Gateway-Initialisierung und erster Poll nach dem Laden der Plattformen.
+
+    Ohne Cache wird die Topologie ermittelt (bei Fehlern erneut nach
+    DEFERRED_RETRY_INTERVAL) und die Entities kommen über den Watcher
+    (``signal_new_channels``) hinzu.
+    """
+    if cached_topology is None:
+        while True:
+            try:
+                init = await client.initialize(144)
+                break
+            except Exception as exc:
+                _LOGGER.warning("Initialisierung von %s fehlgeschlagen, neuer Versuch in %s s: %s",
+                                client.base_url, DEFERRED_RETRY_INTERVAL, exc)
+                await asyncio.sleep(DEFERRED_RETRY_INTERVAL)
+        await topology_cache.async_save(client.base_url, client.export_topology(init))
+        watcher.async_adopt(init)
+    else:
+        try:
+            await client.set_language_query()
+            await client.query_sommer_winter_aktiv()
+        except Exception as exc:
+            _LOGGER.debug("Statusabfrage von %s fehlgeschlagen: %s", client.base_url, exc)
+    # Fehler hier: Entities bleiben unavailable, der Coordinator versucht es im Intervall erneut
+    await coordinator.async_refresh()
+    watcher.async_start(check_now=cached_topology is not None)
+
+
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data.pop(DOMAIN, None)
+        data = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if data:
+            client = data["client"]
+            await client.async_shutdown()
+            if client.capture is not None:
+                await hass.async_add_executor_job(client.capture.close)
     return unload_ok
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """v1 -> v2: unique_ids/Gerät je Config-Entry statt global (mehrere Gateways)."""
+    if entry.version == 1:
+        @callback
+        def _migrate_unique_id(reg_entry: er.RegistryEntry):
+            if reg_entry.unique_id.startswith("webcontrol_"):
+                return {"new_unique_id": f"{entry.entry_id}_{reg_entry.unique_id}"}
+            return None
+
+        await er.async_migrate_entries(hass, entry.entry_id, _migrate_unique_id)
+
+        dev_reg = dr.async_get(hass)
+        device = dev_reg.async_get_device(identifiers={(DOMAIN, "webcontrol")})
+        if device is not None and entry.entry_id in device.config_entries:
+            dev_reg.async_update_device(device.id, new_identifiers={(DOMAIN, entry.entry_id)})
+
+        base_url = entry.data[CONF_BASE_URL].rstrip("/")
+        taken = any(e.unique_id == base_url for e in hass.config_entries.async_entries(DOMAIN))
+        hass.config_entries.async_update_entry(entry, unique_id=entry.unique_id or (None if taken else base_url),
+                                               version=2)
+        _LOGGER.debug("Eintrag %s auf Version 2 migriert", entry.entry_id)
+    return True
@@ -0,0 +1,454 @@
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+import aiohttp
+from yarl import URL
+
+from .scheduler import PRIO_CAUSE, PRIO_COMMAND, PRIO_POLL, GatewayScheduler
+from .webcontrol_client import ChannelInfo, WebControlProtocol
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# (fc, pos, winkel) eines TEL_KANALBEDIENUNG
+Command = Tuple[int, Optional[int], int]  # pos None: Position beibehalten (reiner Winkelbefehl)
+
+
+@dataclass
+class _CommandSlot:
+    """Befehlswarteschlange eines Kanals: höchstens ein Befehl unterwegs, einer wartend."""
+    pending: Optional[Command] = None
+    waiters: List[asyncio.Future] = field(default_factory=list)
+    refresh_cause: bool = False  # nach dem wartenden Befehl Auslöser abfragen
+    inflight: Optional[Command] = None
+    inflight_waiters: List[asyncio.Future] = field(default_factory=list)
+    task: Optional[asyncio.Task] = None
+
+
+class AsyncWebControlClient(WebControlProtocol):
+    """asyncio-Client für das WebControl-Gateway.
+
+    Gleiche Telegramm-API wie ``WebControlClient``, aber auf einer (geteilten)
+    ``aiohttp.ClientSession``. Die Serialisierung der Telegramme übernimmt der
+    ``GatewayScheduler`` (Prioritäts-Lock) statt ``threading.Lock`` – es
+    blockiert also keinen Executor-Thread, und Bedienbefehle überholen Polls.
+    """
+
+    # Auslöser (cliausl): Gültigkeit im State-Store und Verzögerung nach einem Befehl
+    CAUSE_TTL = 300.0
+    CAUSE_REFRESH_DELAY = 2.0
+
+    def __init__(self, base_url: str, session: aiohttp.ClientSession, timeout: int = 5,
+                 scheduler: Optional[GatewayScheduler] = None):
+        super().__init__(base_url, timeout)
+        # Spur im SchedulerHub (mehrere Gateways) oder eigener Scheduler
+        self._scheduler = scheduler or GatewayScheduler()
+        self._session = session
+        self._client_timeout = aiohttp.ClientTimeout(total=timeout)
+        self._command_slots: Dict[Tuple[int,int], _CommandSlot] = {}
+        self._cause_refresh: Dict[int, asyncio.Task] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._probe_task: Optional[asyncio.Task] = None
+        self.health.add_listener(self._on_health_change)
+
+    def _create_background_task(self, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def async_shutdown(self) -> None:
+        """Hintergrundaufgaben (z. B. Auslöser-Abfragen) beenden."""
+        tasks = list(self._background_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ---------- Verbindungszustand ----------
+    def _on_health_change(self, available: bool) -> None:
+        if available:
+            _LOGGER.info("Gateway %s wieder erreichbar", self.base_url)
+            return
+        _LOGGER.warning("Gateway %s nicht erreichbar (%d Fehler in Folge), Telegramme werden bis zur "
+                        "Wiederherstellung sofort abgelehnt", self.base_url, self.health.failures)
+        if self._probe_task is None:
+            self._probe_task = self._create_background_task(self._probe_until_available())
+
+    async def _probe_until_available(self) -> None:
+        """Bei offenem Circuit regelmäßig mit TEL_SPRACHE (kleinstes Telegramm) prüfen."""
+        try:
+            while not self.health.available:
+                await asyncio.sleep(self.health.seconds_until_probe())
+                try:
+                    (response, cnt) = await self._send([self.TEL_SPRACHE, 255], max_retries=1, priority=PRIO_CAUSE)
+                    self._on_language(response)
+                except Exception as exc:
+                    _LOGGER.debug("Probe an %s fehlgeschlagen: %s", self.base_url, exc)
+                    # abgelehnt, weil ein anderes Telegramm gerade die Probe ist: kurz warten
+                    await asyncio.sleep(1)
+        finally:
+            self._probe_task = None
+
+    async def _http_get(self, hex_string: str, tel: Optional[int] = None) -> dict:
+        stats = self.metrics.stats(tel)
+        stats.sent += 1
+        start = time.perf_counter()
+        try:
+            if self.transport is not None:
+                text = await self.transport.async_fetch(hex_string)
+            else:
+                # encoded=True: yarl muss die fertige URL nicht erneut parsen/quoten
+                async with self._session.get(
+                    URL(self._url_prefix + hex_string, encoded=True), timeout=self._client_timeout
+                ) as r:
+                    r.raise_for_status()
+                    text = await r.text()
+        except Exception as exc:
+            stats.errors += 1
+            self.health.record_failure()
+            if self.capture is not None:
+                self.capture.record(hex_string, None, time.perf_counter() - start, str(exc) or type(exc).__name__)
+            raise
+        self.health.record_success()
+        parse_start = time.perf_counter()
+        stats.rtt.add(parse_start - start)
+        if self.capture is not None:
+            self.capture.record(hex_string, text, parse_start - start)
+        result = self._parse_xml_response(text, tel)
+        stats.parse.add(time.perf_counter() - parse_start)
+        return result
+
+    async def _send(self, payload: List[int], max_retries: int = WebControlProtocol.MAX_RETRIES,
+                    priority: int = PRIO_POLL) -> Tuple[dict, int]:
+        """Serialisiertes Senden + busy/counter validation (siehe ``WebControlClient._send``).
+
+        Der Scheduler-Slot gilt je Versuch; die Backoff-Pause läuft ohne Slot,
+        so dass andere Befehle und Polls dazwischen senden können.
+        ``priority``: PRIO_COMMAND, PRIO_CAUSE oder PRIO_POLL.
+        """
+        tel = payload[0]
+        delay: Optional[float] = None
+        busy_since: Optional[float] = None
+        for attempt in range(max_retries):
+            wait_start = time.perf_counter()
+            async with self._scheduler.slot(priority):
+                self.metrics.lock_wait.add(time.perf_counter() - wait_start)
+                self._check_health()
+                hex_msg, cnt = self._build_message(payload)
+                response = await self._http_get(hex_msg, payload[0])
+            next_payload = self._next_payload(payload, response, cnt)
+            if next_payload is None:
+                if busy_since is not None:
+                    self.backoff.observe_busy(tel, time.monotonic() - busy_since)
+                return response, cnt
+            self.metrics.stats(payload[0]).retries += 1
+            if response.get("busy"):
+                busy_since = busy_since or time.monotonic()
+                delay = self.backoff.next_delay(tel, delay)
+            else:
+                delay = self.backoff.min_delay
+            payload = next_payload
+            await asyncio.sleep(delay)
+        # Alle Versuche durch: letztes Response zurückgeben
+        return response, cnt
+
+    # ---------- single command helpers ----------
+    async def set_language_query(self) -> dict:
+        (response, cnt) = await self._send([self.TEL_SPRACHE, 255])
+        return self._on_language(response)
+
+    async def query_clima_block(self, start_index: int) -> List[ChannelInfo]:
+        (response, cnt) = await self._send([self.TEL_CLIMATRONIC_KANAL_ABFRAGEN, start_index])
+        return self._on_clima_block(response, start_index)
+
+    async def load_all_channels(self, max_elements: int = 144) -> List[ChannelInfo]:
+        all_channels: List[ChannelInfo] = []
+        for start in range(0, max_elements, self.CLIMA_BLOCK_SIZE):
+            block = await self.query_clima_block(start)
+            if not block:
+                break
+            all_channels.extend(block)
+        return all_channels
+
+    async def query_sommer_winter_aktiv(self) -> dict:
+        (response, cnt) = await self._send([self.TEL_SOMMER_WINTER_AKTIV])
+        return self._on_sommer_winter(response)
+
+    async def check_clima_data(self) -> dict:
+        (response, cnt) = await self._send([self.TEL_CHECK_CLIMA_DATA])
+        return self._on_check_clima(response)
+
+    async def load_rooms_matrix(self, max_rooms: int = WebControlProtocol.DEF_MAXRAUM,
+                                expected: Optional[Set[int]] = None) -> Dict[int, Tuple[int,int]]:
+        """cli -> (raum, kanal); mit ``expected`` Abbruch, sobald alle diese cli gefunden sind."""
+        mapping: Dict[int, Tuple[int,int]] = {}
+        missing = set(expected) if expected is not None else None
+        gap = 0
+        for r in range(0, max_rooms):
+            if missing is not None and not missing:
+                break
+            (response, cnt) = await self._send([self.TEL_RAUM_ABFRAGEN, r])
+            exists = self._on_room(response, r, mapping)
+            gap = 0 if exists else gap + 1
+            if missing is not None:
+                missing -= mapping.keys()
+            if self._room_scan_done(exists, missing, gap):
+                break
+        return mapping
+
+    async def discover(self, max_elements: int = 144) -> Tuple[List[ChannelInfo], Dict[int, Tuple[int,int]]]:
+        channels = await self.load_all_channels(max_elements)
+        await self.query_sommer_winter_aktiv()
+        await self.check_clima_data()
+        cli_to_roomchan = await self.load_rooms_matrix(expected=self._expected_clis(channels))
+        return channels, cli_to_roomchan
+
+    async def initialize(self, max_elements: int = 144) -> dict:
+        await self.set_language_query()
+        channels, cli_to_roomchan = await self.discover(max_elements)
+        return self.map_channels(channels, cli_to_roomchan)
+
+    async def rediscover(self, channels: List[ChannelInfo], rooms: Dict[int, Tuple[int,int]]
+                         ) -> Tuple[List[ChannelInfo], Dict[int, Tuple[int,int]], Set[int]]:
+        """Inkrementeller Abgleich einer bekannten Topologie.
+
+        Liest die Kanalblöcke neu (ein Telegramm je 4 Kanäle, Abbruch am ersten
+        leeren Block) und danach die Zeilen der bekannten Räume – auch ohne
+        geänderte Kanalsignatur, da ein Kanal in einen anderen Raum verschoben
+        sein kann. Räume dahinter werden nur abgefragt, solange Kanäle ohne
+        Raum übrig sind, statt die komplette Raummatrix. Liefert Kanäle,
+        cli->(raum, kanal) und die geänderten bzw. verschobenen cli-Indizes.
+        """
+        old = {ch.cli_index: ch for ch in channels}
+        new_channels = await self.load_all_channels(144)
+        new = {ch.cli_index: ch for ch in new_channels}
+        changed = {cli for cli in old.keys() | new.keys()
+                   if self.channel_signature(old.get(cli)) != self.channel_signature(new.get(cli))}
+        new_rooms = {cli: rk for cli, rk in rooms.items() if cli in new and new[cli].type != self.TYPE_INVALID}
+
+        unmapped = {cli for cli in changed
+                    if cli in new and new[cli].type != self.TYPE_INVALID and cli not in new_rooms}
+        known = sorted({rk[0] for rk in rooms.values()})
+        candidates = known + list(range(known[-1] + 1 if known else 0, self.DEF_MAXRAUM))
+        gap = 0
+        for r in candidates:
+            if r not in known and not unmapped:
+                break
+            (response, cnt) = await self._send([self.TEL_RAUM_ABFRAGEN, r])
+            room: Dict[int, Tuple[int,int]] = {}
+            exists = self._on_room(response, r, room)
+            for cli in [cli for cli, rk in new_rooms.items() if rk[0] == r]:
+                del new_rooms[cli]
+                if cli not in room:
+                    unmapped.add(cli)  # aus dem Raum verschoben: weitersuchen
+            new_rooms.update({cli: rk for cli, rk in room.items() if cli in new})
+            unmapped -= room.keys()
+            if r not in known:
+                # hinter den bekannten Räumen: gleiche Lücken-Regel wie load_rooms_matrix
+                gap = 0 if exists else gap + 1
+                if self._room_scan_done(exists, unmapped, gap):
+                    break
+        changed |= {cli for cli, rk in new_rooms.items() if rooms.get(cli) != rk}
+        return new_channels, new_rooms, changed
+
+    async def initialize_from_topology(self, topology: dict) -> dict:
+        """Wie ``initialize``, aber Kanäle/Räume aus einer gespeicherten Topologie."""
+        await self.set_language_query()
+        await self.query_sommer_winter_aktiv()
+        channels, cli_to_roomchan = self.topology_channels(topology)
+        return self.map_channels(channels, cli_to_roomchan)
+
+    # ---------- Polling ----------
+    async def poll(self, raumindex: int, kanalindex: int) -> Tuple[dict, int]:
+        (response, cnt) = await self._send([self.TEL_POLLING, raumindex, kanalindex, 0])
+        self._on_poll(response, raumindex, kanalindex)
+        return (response, cnt)
+
+    async def poll_block(self, start_index: int) -> List[int]:
+        """Zustand von bis zu vier Kanälen ab ``start_index`` mit einem Telegramm lesen."""
+        (response, cnt) = await self._send([self.TEL_CLIMATRONIC_KANAL_ABFRAGEN, start_index])
+        return self._on_state_block(response, start_index)
+
+    # ---------- Auslöser ----------
+    async def read_ausloeser(self, raumindex: int, kanalindex: int, cli_index: int) -> Optional[int]:
+        (response, cnt) = await self._send([self.TEL_AUSLOESER, raumindex, kanalindex, cli_index], priority=PRIO_CAUSE)
+        return self._on_ausloeser(response, cli_index)
+
+    # Bedienungen
+    async def _channel_command(self, raumindex: int, kanalindex: int, fc: int, pos: int, winkel: int) -> dict:
+        (response, cnt) = await self._send(self._channel_payload(raumindex, kanalindex, fc, pos, winkel),
+                                           priority=PRIO_COMMAND)
+        if self._command_accepted(response):
+            self._notify_command(raumindex, kanalindex, fc, pos)
+        return self._on_channel_command(response)
+
+    # ---------- Befehlswarteschlange (Behänge) ----------
+    async def _queue_command(self, ch: ChannelInfo, fc: int, pos: int, winkel: int,
+                             refresh_cause: bool = True) -> dict:
+        """Kanalbefehl mit last-write-wins je Kanal.
+
+        Solange ein Befehl für den Kanal unterwegs ist, wartet höchstens ein
+        weiterer; neuere Ziele ersetzen ihn. Positions- und Winkelbefehle
+        werden dabei zu einem Telegramm zusammengeführt (``_merge_command``).
+        Ein Befehl, der dem laufenden gleicht (z. B. doppeltes "Stopp"), wird
+        nicht erneut gesendet. Alle Aufrufer erhalten die Antwort des Befehls,
+        der tatsächlich gesendet wurde. ``pos=None``: Position beibehalten.
+        ``refresh_cause=False`` (Gruppenbefehle): danach keine Auslöser-Abfrage,
+        es sei denn, ein zusammengeführter Einzelbefehl verlangt sie.
+        """
+        key = (ch.raumindex, ch.kanalindex)
+        slot = self._command_slots.setdefault(key, _CommandSlot())
+        cmd = self._merge_command(slot.pending if slot.pending is not None else slot.inflight, (fc, pos, winkel))
+        if cmd[1] is None:
+            cmd = (fc, self._current_percent(ch), winkel)
+        fut = asyncio.get_running_loop().create_future()
+        if slot.pending is None and slot.inflight == cmd:
+            slot.inflight_waiters.append(fut)
+        else:
+            slot.refresh_cause = refresh_cause or (slot.pending is not None and slot.refresh_cause)
+            slot.pending = cmd
+            slot.waiters.append(fut)
+            if slot.task is None:
+                slot.task = self._create_background_task(self._drain_commands(ch, slot))
+        return await fut
+
+    def _merge_command(self, previous: Optional[Command], cmd: Command) -> Command:
+        """FC_STATE-Befehle kombinieren: fehlende Position bzw. ungültigen Winkel vom vorherigen übernehmen."""
+        fc, pos, winkel = cmd
+        if previous is None or fc != self.FC_STATE or previous[0] != self.FC_STATE:
+            return cmd
+        if pos is None:
+            pos = previous[1]
+        if winkel == self.INVALID_WINKEL:
+            winkel = previous[2]
+        return (fc, pos, winkel)
+
+    async def _drain_commands(self, ch: ChannelInfo, slot: _CommandSlot) -> None:
+        try:
+            while slot.pending is not None:
+                cmd, waiters, refresh_cause = slot.pending, slot.waiters, slot.refresh_cause
+                slot.pending, slot.waiters, slot.refresh_cause = None, [], False
+                slot.inflight, slot.inflight_waiters = cmd, waiters
+                try:
+                    response = await self._channel_command(ch.raumindex, ch.kanalindex, *cmd)
+                    if refresh_cause:
+                        self.schedule_cause_refresh(ch, force=True)
+                except Exception as exc:
+                    for waiter in slot.inflight_waiters:
+                        if not waiter.done():
+                            waiter.set_exception(exc)
+                else:
+                    for waiter in slot.inflight_waiters:
+                        if not waiter.done():
+                            waiter.set_result(response)
+                slot.inflight, slot.inflight_waiters = None, []
+        finally:
+            # abgebrochen (async_shutdown): wartende Aufrufer nicht hängen lassen
+            for waiter in slot.inflight_waiters + slot.waiters:
+                if not waiter.done():
+                    waiter.cancel()
+            slot.inflight, slot.inflight_waiters = None, []
+            slot.pending, slot.waiters = None, []
+            slot.task = None
+
+    # ---------- Auslöser im Hintergrund ----------
+    def refresh_stale_cause(self, ch: ChannelInfo) -> None:
+        """Veralteten Auslöser-Eintrag (älter als ``CAUSE_TTL``) im Hintergrund erneuern.
+
+        Kanäle ohne Eintrag (noch kein Befehl seit dem Start) werden nicht abgefragt.
+        """
+        age = self.states.cause_age(ch.cli_index)
+        if age is not None and age > self.CAUSE_TTL:
+            self.schedule_cause_refresh(ch)
+
+    def schedule_cause_refresh(self, ch: ChannelInfo, force: bool = False) -> None:
+        """TEL_AUSLOESER verzögert außerhalb des Befehlspfads senden (je Kanal höchstens eine Abfrage offen).
+
+        ``force``: auch bei gültigem Cache-Eintrag (nach einem Fahrbefehl ändert sich der Auslöser).
+        """
+        if ch.raumindex is None or ch.kanalindex is None or ch.cli_index in self._cause_refresh:
+            return
+        age = self.states.cause_age(ch.cli_index)
+        if not force and age is not None and age <= self.CAUSE_TTL:
+            return
+        task = self._create_background_task(self._refresh_cause(ch))
+        self._cause_refresh[ch.cli_index] = task
+        task.add_done_callback(lambda _: self._cause_refresh.pop(ch.cli_index, None))
+
+    async def _refresh_cause(self, ch: ChannelInfo) -> None:
+        await asyncio.sleep(self.CAUSE_REFRESH_DELAY)
+        try:
+            await self.read_ausloeser(ch.raumindex, ch.kanalindex, ch.cli_index)
+        except Exception as exc:
+            _LOGGER.debug("Auslöser für Kanal %s nicht lesbar: %s", ch.cli_index, exc)
+
+    async def cover_set_position(self, ch: ChannelInfo, percent: int,
+                                 winkel: int = WebControlProtocol.INVALID_WINKEL) -> dict:
+        return await self._queue_command(ch, self.FC_STATE, int(percent), winkel)
+
+    async def cover_set_tilt(self, ch: ChannelInfo, winkel: int, percent: Optional[int] = None) -> dict:
+        """Lamellenwinkel; ohne ``percent`` bleibt die Position eines wartenden Befehls bzw. die aktuelle."""
+        return await self._queue_command(ch, self.FC_STATE, percent, winkel)
+
+    async def cover_open(self, ch: ChannelInfo) -> dict:
+        return await self._queue_command(ch, self.FC_HOCH, 0, 0)
+
+    async def cover_close(self, ch: ChannelInfo) -> dict:
+        return await self._queue_command(ch, self.FC_TIEF, 0, 0)
+
+    async def cover_stop(self, ch: ChannelInfo) -> dict:
+        return await self._queue_command(ch, self.FC_STOP, 0, self.INVALID_WINKEL)
+
+    async def move_many(self, commands: List[Tuple[ChannelInfo, int, int, int]]) -> dict:
+        """Mehrere Kanäle direkt hintereinander fahren: [(ch, fc, pos, winkel), ...].
+
+        Jeder Befehl läuft über die Befehlswarteschlange seines Kanals
+        (``_queue_command``): er ersetzt einen dort wartenden Befehl, und ein
+        später eingereihter Einzelbefehl überholt ihn nicht. Die Telegramme
+        laufen mit Befehlspriorität (vor wartenden Polls) und ohne Auslöser-
+        Abfragen je Kanal. Liefert eine Zusammenfassung mit den Antworten je cli-Index.
+        """
+        results: Dict[int, dict] = {}
+        queued: List[ChannelInfo] = []
+        calls = []
+        for ch, fc, pos, winkel in commands:
+            if ch.raumindex is None or ch.kanalindex is None:
+                results[ch.cli_index] = {"ok": False, "error": "channel not mapped"}
+                continue
+            if fc in (self.FC_HOCH, self.FC_TIEF):
+                winkel = 0
+            queued.append(ch)
+            calls.append(self._queue_command(ch, fc, int(pos), winkel, refresh_cause=False))
+        sent = 0
+        for ch, response in zip(queued, await asyncio.gather(*calls, return_exceptions=True)):
+            if isinstance(response, BaseException):
+                response = {"ok": False, "error": str(response)}
+            else:
+                sent += 1
+            results[ch.cli_index] = response
+        failed = [cli for cli, response in results.items() if not self._command_accepted(response)]
+        return {
+            "sent": sent,
+            "ok": len(results) - len(failed),
+            "failed": failed,
+            "results": results,
+        }
+
+    async def light_on(self, ch: ChannelInfo) -> dict:
+        return await self._channel_command(ch.raumindex, ch.kanalindex, self.FC_STATE, 100, self.INVALID_WINKEL)
+
+    async def light_off(self, ch: ChannelInfo) -> dict:
+        return await self._channel_command(ch.raumindex, ch.kanalindex, self.FC_STOP, 0, self.INVALID_WINKEL)
+
+    # Switches (global): Abwesend & Automatik
+    async def set_abwesend(self, enabled: bool) -> Optional[bool]:
+        (response, cnt) = await self._send([self.TEL_ABWESEND, 1 if enabled else 0], priority=PRIO_COMMAND)
+        return self._on_abwesend(response, enabled)
+
+    async def set_automatik(self, enabled: bool) -> Optional[bool]:
+        (response, cnt) = await self._send([self.TEL_AUTOMATIK, 1 if enabled else 0], priority=PRIO_COMMAND)
+        return self._on_automatik(response, enabled)
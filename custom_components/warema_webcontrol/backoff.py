@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import Dict, Optional
+
+
+class AdaptiveBackoff:
+    """Wartezeiten für Wiederholungen in ``_send``, gelernt je Telegrammtyp.
+
+    Bei ``RES_CLIMA_COM_BUSY`` beginnt das Nachpollen mit einer kurzen
+    Pause, die sich bis ``max_delay`` verdoppelt. Wie lange das Gateway für
+    einen Telegrammtyp typischerweise busy bleibt, wird als gleitender
+    Mittelwert (EWMA) gemerkt; die erste Pause startet dann bei der Hälfte
+    dieser Dauer statt bei ``min_delay``.
+    """
+
+    def __init__(self, min_delay: float = 0.05, max_delay: float = 2.0,
+                 factor: float = 2.0, alpha: float = 0.3):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.alpha = alpha
+        self._busy_ewma: Dict[int, float] = {}
+
+    def next_delay(self, tel: int, previous: Optional[float] = None) -> float:
+        """Pause vor dem nächsten Versuch; ``previous`` ist die letzte Pause dieses ``_send``."""
+        if previous is None:
+            learned = self._busy_ewma.get(tel)
+            first = learned / 2 if learned is not None else self.min_delay
+            return min(self.max_delay, max(self.min_delay, first))
+        return min(self.max_delay, previous * self.factor)
+
+    def observe_busy(self, tel: int, seconds: float) -> None:
+        """Beobachtete Busy-Dauer (erste Busy-Antwort bis Erfolg) einlernen."""
+        old = self._busy_ewma.get(tel)
+        self._busy_ewma[tel] = seconds if old is None else old + self.alpha * (seconds - old)
+
+    def learned(self) -> Dict[int, float]:
+        return dict(self._busy_ewma)
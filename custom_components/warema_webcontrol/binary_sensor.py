@@ -3,15 +3,20 @@ from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from . import DOMAIN
+from .const import entity_unique_id
 
 class WebControlBinarySensorSommerWinter(BinarySensorEntity):
     _attr_device_class = "cold"  # winter aktiv => kalt
 
-    def __init__(self, client):
+    def __init__(self, client, entry_id: str, device_info: DeviceInfo):
         self._client = client
         self._attr_name = "Sommer/Winter aktiv"
-        self._attr_unique_id = "webcontrol_binary_sommer_winter"
-        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, "webcontrol")}, name="Warema WebControl")
+        self._attr_unique_id = entity_unique_id(entry_id, "binary_sommer_winter")
+        self._attr_device_info = device_info
+
+    @property
+    def available(self) -> bool:
+        return self._client.health.available
 
     @property
     def is_on(self):
@@ -21,5 +26,5 @@ class WebControlBinarySensorSommerWinter(BinarySensorEntity):
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
-    client = hass.data[DOMAIN]["client"]
-    async_add_entities([WebControlBinarySensorSommerWinter(client)], True)
+    data = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities([WebControlBinarySensorSommerWinter(data["client"], entry.entry_id, data["device_info"])], True)
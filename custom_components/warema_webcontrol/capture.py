@@ -0,0 +1,193 @@
+"""Mitschnitt und Wiedergabe des Gateway-Verkehrs (Profiling ohne Hardware).
+
+Format (append-only, optional gzip bei Endung ``.gz``): eine Kopfzeile als
+JSON-Objekt, danach je Telegramm eine JSON-Liste
+``[t, rtt, request_hex, response_xml, error]`` mit ``t`` = Sekunden seit
+Beginn des Mitschnitts und ``rtt`` = Laufzeit der HTTP-Anfrage.
+"""
+from __future__ import annotations
+import asyncio
+import gzip
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Any, Callable, List, Optional, Tuple
+
+CAPTURE_FORMAT = "warema-webcontrol-capture"
+CAPTURE_VERSION = 1
+
+_COUNTER_RE = re.compile(r"<befehlszaehler>\s*(\d+)\s*</befehlszaehler>")
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+@dataclass(slots=True)
+class CaptureEntry:
+    t: float
+    rtt: float
+    request: str
+    response: Optional[str]
+    error: Optional[str] = None
+
+
+class CaptureWriter:
+    """Schreibt Telegramme eines Clients mit (``client.capture = CaptureWriter(...)``).
+
+    ``record`` puffert nur im Speicher; alle ``FLUSH_EVERY`` Telegramme wird der
+    Puffer geschrieben. Mit ``executor`` (z. B. ``hass.async_add_executor_job``)
+    läuft das Schreiben (gzip + flush) im Executor statt im Event-Loop, ohne
+    ``executor`` synchron im aufrufenden Thread (``WebControlClient``, Benchmarks).
+    """
+
+    FLUSH_EVERY = 64
+
+    def __init__(self, path: str, base_url: Optional[str] = None,
+                 executor: Optional[Callable[[Callable[[], None]], Any]] = None):
+        self.path = path
+        self.count = 0
+        self._executor = executor
+        self._lock = threading.Lock()     # Puffer
+        self._io_lock = threading.Lock()  # Datei; hält die Reihenfolge der Blöcke
+        self._buffer: List[str] = []
+        self._start = time.monotonic()
+        self._fh = _open(path, "a")
+        header = {
+            "format": CAPTURE_FORMAT,
+            "version": CAPTURE_VERSION,
+            "base_url": base_url,
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self._fh.write(json.dumps(header) + "\n")
+
+    def record(self, request_hex: str, response: Optional[str], rtt: float, error: Optional[str] = None) -> None:
+        line = json.dumps([round(time.monotonic() - self._start, 4), round(rtt, 4), request_hex, response, error],
+                          separators=(",", ":"))
+        with self._lock:
+            if self._fh is None:
+                return
+            self._buffer.append(line)
+            self.count += 1
+            if len(self._buffer) < self.FLUSH_EVERY:
+                return
+        if self._executor is not None:
+            self._executor(self.flush)
+        else:
+            self.flush()
+
+    def flush(self) -> None:
+        """Gepufferte Telegramme schreiben (blockierend)."""
+        with self._io_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+            if self._fh is None or not lines:
+                return
+            self._fh.write("\n".join(lines) + "\n")
+            self._fh.flush()
+
+    def close(self) -> None:
+        with self._io_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+                fh, self._fh = self._fh, None
+            if fh is not None:
+                if lines:
+                    fh.write("\n".join(lines) + "\n")
+                fh.close()
+
+
+def read_capture(path: str) -> Tuple[dict, List[CaptureEntry]]:
+    """Kopf und Einträge eines Mitschnitts; mehrere Sitzungen in einer Datei werden aneinandergehängt."""
+    header: dict = {}
+    entries: List[CaptureEntry] = []
+    offset = 0.0
+    with _open(path, "r") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, dict):
+                if item.get("format") != CAPTURE_FORMAT:
+                    raise ValueError(f"{path}: kein WebControl-Mitschnitt")
+                header = header or item
+                offset = entries[-1].t if entries else 0.0
+                continue
+            entries.append(CaptureEntry(offset + item[0], item[1], item[2], item[3], item[4]))
+    return header, entries
+
+
+class ReplayTransport:
+    """Beantwortet Telegramme aus einem Mitschnitt statt über HTTP (``client.transport``).
+
+    Zugeordnet wird über die Nutzdaten (Länge + Payload, ohne Befehlszähler):
+    der nächste noch nicht verwendete Eintrag mit gleicher Nutzlast innerhalb
+    von ``window`` Einträgen. Der Befehlszähler in der Antwort wird auf den
+    aktuellen umgeschrieben; aufgezeichnete Zählerfehler bleiben Zählerfehler.
+    ``speed``: 1 = Original-Laufzeiten, 10 = zehnfach schneller, 0 = ohne Wartezeit.
+    """
+
+    def __init__(self, entries: List[CaptureEntry], speed: float = 1.0, window: int = 64):
+        self.entries = entries
+        self.speed = speed
+        self.window = window
+        self.used = [False] * len(entries)
+        self._cursor = 0
+        self.served = 0
+        self.missing = 0
+
+    @property
+    def skipped(self) -> int:
+        """Einträge vor dem Cursor, die keine Anfrage abgeholt hat."""
+        return sum(1 for used in self.used[:self._cursor] if not used)
+
+    def _take(self, request_hex: str) -> CaptureEntry:
+        key = request_hex[4:]
+        while self._cursor < len(self.entries) and self.used[self._cursor]:
+            self._cursor += 1
+        end = min(len(self.entries), self._cursor + self.window)
+        for idx in range(self._cursor, end):
+            entry = self.entries[idx]
+            if not self.used[idx] and entry.request[4:] == key:
+                self.used[idx] = True
+                if idx == self._cursor:
+                    self._cursor += 1
+                self.served += 1
+                return entry
+        self.missing += 1
+        raise LookupError(f"Telegramm {request_hex} nicht im Mitschnitt (ab Eintrag {self._cursor})")
+
+    def _answer(self, request_hex: str, entry: CaptureEntry) -> str:
+        if entry.response is None:
+            raise ConnectionError(entry.error or "aufgezeichneter Verbindungsfehler")
+        counter = int(request_hex[2:4], 16)
+        recorded = int(entry.request[2:4], 16)
+
+        def _patch(match: re.Match) -> str:
+            # Zählerfehler des Originals beibehalten, sonst aktuellen Zähler einsetzen
+            value = counter if int(match.group(1)) == recorded else (counter + 1) % 255
+            return f"<befehlszaehler>{value}</befehlszaehler>"
+
+        return _COUNTER_RE.sub(_patch, entry.response, count=1)
+
+    def delay(self, entry: CaptureEntry) -> float:
+        return entry.rtt / self.speed if self.speed > 0 else 0.0
+
+    def fetch(self, request_hex: str) -> str:
+        """Blockierende Variante (``WebControlClient``)."""
+        entry = self._take(request_hex)
+        if self.speed > 0:
+            time.sleep(self.delay(entry))
+        return self._answer(request_hex, entry)
+
+    async def async_fetch(self, request_hex: str) -> str:
+        """asyncio-Variante (``AsyncWebControlClient``)."""
+        entry = self._take(request_hex)
+        if self.speed > 0:
+            await asyncio.sleep(self.delay(entry))
+        return self._answer(request_hex, entry)
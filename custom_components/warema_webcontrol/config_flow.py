@@ -2,23 +2,30 @@
 # custom_components/webcontrol/config_flow.py
 from __future__ import annotations
 
+from urllib.parse import urlparse
+
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import (
     DOMAIN,
     CONF_BASE_URL,
     CONF_SCAN_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
+    CONF_STREAMING,
+    CONF_STREAM_RATE,
+    DEFAULT_STREAM_RATE,
+    CONF_DEFERRED_START,
 )
-from .webcontrol_client import WebControlClient
+from .async_client import AsyncWebControlClient
 
 
 class WebControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Config flow für Warema WebControl."""
-    VERSION = 1
+    VERSION = 2
 
     async def async_step_user(self, user_input=None) -> FlowResult:
         errors = {}
@@ -27,19 +34,23 @@ class WebControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             base_url = user_input[CONF_BASE_URL].rstrip("/")
             scan_interval = int(user_input[CONF_SCAN_INTERVAL])
 
+            # ein Eintrag je Gateway
+            await self.async_set_unique_id(base_url)
+            self._abort_if_unique_id_configured()
+
             if scan_interval <= 0:
                 errors["scan_interval"] = "invalid_scan_interval"
             else:
-                client = WebControlClient(base_url)
+                client = AsyncWebControlClient(base_url, async_get_clientsession(self.hass))
                 try:
                     # Verbindung testen (Sprache abfragen)
-                    await self.hass.async_add_executor_job(client.set_language_query)
+                    await client.set_language_query()
                 except Exception:
                     errors["base_url"] = "cannot_connect"
 
                 if not errors:
                     return self.async_create_entry(
-                        title="Warema WebControl",
+                        title=f"Warema WebControl ({urlparse(base_url).hostname or base_url})",
                         data={
                             CONF_BASE_URL: base_url,
                             CONF_SCAN_INTERVAL: scan_interval,
@@ -56,6 +67,11 @@ class WebControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Optional: YAML‑Import unterstützen, falls vorhanden."""
         return await self.async_step_user(import_config)
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> OptionsFlowHandler:
+        return OptionsFlowHandler(config_entry)
+
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
     """OptionsFlow für Intervall‑Änderungen."""
@@ -65,15 +81,25 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     async def async_step_init(self, user_input=None) -> FlowResult:
         if user_input is not None:
             scan_interval = int(user_input[CONF_SCAN_INTERVAL])
+            stream_rate = int(user_input[CONF_STREAM_RATE])
             if scan_interval <= 0:
                 return self.async_show_form(
                     step_id="init",
                     data_schema=self._schema(),
                     errors={"scan_interval": "invalid_scan_interval"},
                 )
+            if stream_rate <= 0:
+                return self.async_show_form(
+                    step_id="init",
+                    data_schema=self._schema(),
+                    errors={"stream_rate": "invalid_stream_rate"},
+                )
 
             return self.async_create_entry(title="", data={
-                CONF_SCAN_INTERVAL: scan_interval
+                CONF_SCAN_INTERVAL: scan_interval,
+                CONF_STREAMING: bool(user_input[CONF_STREAMING]),
+                CONF_STREAM_RATE: stream_rate,
+                CONF_DEFERRED_START: bool(user_input[CONF_DEFERRED_START]),
             })
 
         return self.async_show_form(step_id="init", data_schema=self._schema())
@@ -83,10 +109,12 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             CONF_SCAN_INTERVAL,
             self.config_entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
         )
+        options = self.config_entry.options
         return vol.Schema({
-            vol.Required(CONF_SCAN_INTERVAL, default=current): int
+            vol.Required(CONF_SCAN_INTERVAL, default=current): int,
+            # Streaming: TEL_POLLING reihum mit fester Rate statt Sweeps im scan_interval
+            vol.Required(CONF_STREAMING, default=options.get(CONF_STREAMING, False)): bool,
+            vol.Required(CONF_STREAM_RATE, default=options.get(CONF_STREAM_RATE, DEFAULT_STREAM_RATE)): int,
+            # Entities beim Start aus dem Topologie-Cache, Gateway-Initialisierung im Hintergrund
+            vol.Required(CONF_DEFERRED_START, default=options.get(CONF_DEFERRED_START, False)): bool,
         })
-
-
-def async_get_options_flow(config_entry):
-    return OptionsFlowHandler(config_entry)
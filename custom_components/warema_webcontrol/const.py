@@ -3,6 +3,41 @@ DOMAIN = "warema_webcontrol"
 CONF_BASE_URL = "base_url"
 CONF_SCAN_INTERVAL = "scan_interval"
 DEFAULT_SCAN_INTERVAL = 30 # seconds
+CONF_STREAMING = "streaming"
+CONF_STREAM_RATE = "stream_rate"
+DEFAULT_STREAM_RATE = 4 # Telegramme/s im Streaming-Modus (TEL_POLLING reihum)
+CONF_DEFERRED_START = "deferred_start"
+DEFERRED_RETRY_INTERVAL = 30 # seconds, neuer Initialisierungsversuch beim verzögerten Start ohne Cache
+FAST_POLL_INTERVAL = 2 # seconds, Kanäle in Bewegung / direkt nach einem Befehl
+POLL_BACKOFF_FACTOR = 2 # Intervall-Faktor je unveränderter Abfrage bis scan_interval
+MOTION_ARRIVAL_MARGIN = 1 # seconds, Abfrage kurz nach der laut Bewegungsmodell erwarteten Ankunft
+DISCOVERY_INTERVAL = 900 # seconds, TEL_CHECK_CLIMA_DATA als Hinweis auf Topologie-Änderungen
+
+
+# hass.data: DOMAIN -> {entry_id: Laufzeitdaten}, dazu ein gemeinsamer SchedulerHub
+DATA_SCHEDULER_HUB = f"{DOMAIN}_scheduler_hub"
+# gemeinsamer TopologyCache (ein Store für alle Gateways, Schlüssel = client.base_url)
+DATA_TOPOLOGY_CACHE = f"{DOMAIN}_topology_cache"
+
+
+def entity_unique_id(entry_id: str, key: str) -> str:
+    """unique_id je Gateway, z. B. ``<entry_id>_webcontrol_cover_12``."""
+    return f"{entry_id}_webcontrol_{key}"
+
+
+def signal_channel_update(entry_id: str, raumindex: int, kanalindex: int) -> str:
+    """Dispatcher-Signal im Streaming-Modus: Zustand von (raum, kanal) hat sich geändert."""
+    return f"{DOMAIN}_{entry_id}_update_{raumindex}_{kanalindex}"
+
+
+def signal_channel_changed(entry_id: str, kind: str, cli_index: int) -> str:
+    """Dispatcher-Signal: Kanal ``cli_index`` umbenannt/geändert (neues ChannelInfo), Entity bleibt bestehen."""
+    return f"{DOMAIN}_{entry_id}_changed_{kind}_{cli_index}"
+
+
+def signal_new_channels(entry_id: str, kind: str) -> str:
+    """Dispatcher-Signal: neue Kanäle (Liste ChannelInfo) für Plattform ``kind`` (cover/light)."""
+    return f"{DOMAIN}_{entry_id}_new_{kind}"
 
 TYPE_RAFFSTORE = 2
 TYPE_ROLLLADEN = 3
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, List, Mapping, Set, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .async_client import AsyncWebControlClient
+from .const import FAST_POLL_INTERVAL, MOTION_ARRIVAL_MARGIN, POLL_BACKOFF_FACTOR
+from .history import PositionHistory
+from .motion import FULL_TRAVEL, CoverMotion
+from .poll_scheduler import AdaptivePollScheduler
+from .state_store import ChannelKey, ChannelState
+from .webcontrol_client import ChannelInfo, WebControlProtocol
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WebControlCoordinator(DataUpdateCoordinator[Mapping[ChannelKey, ChannelState]]):
+    """Pollt fällige Kanäle und benachrichtigt nur Entities, deren Zustand sich geändert hat.
+
+    ``data`` ist ein unveränderlicher Snapshot ``{(raum, kanal): ChannelState}``.
+    Entities registrieren sich mit ihrem (raum, kanal) als Listener-Kontext;
+    Listener ohne Kontext werden bei jeder Aktualisierung aufgerufen.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: AsyncWebControlClient,
+                 channels: List[ChannelInfo], scan_seconds: int, bulk_refresh: bool = True):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="webcontrol_coordinator",
+            update_interval=timedelta(seconds=scan_seconds),
+            always_update=False,
+        )
+        self.client = client
+        # Ruhende Kanäle per Blockabfrage (4 Kanäle je Telegramm), TEL_POLLING nur bei Bewegung
+        self.bulk_refresh = bulk_refresh
+        # Pro Kanal eigenes Intervall: schnell nach Befehl/Bewegung, sonst bis scan_interval
+        self.poll_scheduler = AdaptivePollScheduler(FAST_POLL_INTERVAL, scan_seconds, POLL_BACKOFF_FACTOR)
+        # Bewegungsmodell je Behang (interpolierte Position, Poll zur erwarteten Ankunft)
+        self.motion: Dict[ChannelKey, CoverMotion] = {}
+        # Positionsverlauf je Behang (Ringpuffer + 5-min-Buckets, Dienst get_history)
+        self.history: Dict[ChannelKey, PositionHistory] = {}
+        self._cli_keys: Dict[int, ChannelKey] = {}
+        self._covers: Dict[ChannelKey, ChannelInfo] = {}
+        # Streaming-Modus: StateStream pollt reihum, der Coordinator plant selbst keine Abfragen
+        self.streaming = False
+        self.async_add_channels(channels)
+        self._changed: Set[ChannelKey] = set()
+        self._notified_success = True
+
+    async def _async_update_data(self) -> Mapping[ChannelKey, ChannelState]:
+        client = self.client
+        try:
+            now = time.monotonic()
+            due = self.poll_scheduler.due(now)
+            polls, blocks = self._plan_refresh(due, now) if self.bulk_refresh else (due, {})
+            # Kanäle in Bewegung einzeln (aktuelle Fahrtrückmeldung), fällige ruhende blockweise
+            for key in polls:
+                await client.poll(*key)
+                self._observe(key)
+            for start, keys in blocks.items():
+                pending = set(keys)
+                for cli in await client.poll_block(start):
+                    key = self._cli_keys.get(cli)
+                    # auch nicht fällige Nachbarn im Block zählen als abgefragt
+                    if key is not None and not self.wants_poll(key, time.monotonic()):
+                        self._observe(key)
+                        pending.discard(key)
+                # nicht im Blockergebnis enthalten: einzeln nachfragen
+                for key in keys:
+                    if key in pending:
+                        await client.poll(*key)
+                        self._observe(key)
+        except Exception as exc:
+            raise UpdateFailed(str(exc)) from exc
+        finally:
+            if not self.streaming:
+                self.update_interval = timedelta(seconds=self.poll_scheduler.seconds_until_next())
+        return self._snapshot()
+
+    def wants_poll(self, key: ChannelKey, now: float) -> bool:
+        """True für Kanäle, die TEL_POLLING brauchen: im Schnelltakt oder laut Modell in Fahrt."""
+        if self.poll_scheduler.is_active(key):
+            return True
+        motion = self.motion.get(key)
+        return motion is not None and motion.direction(now) != 0
+
+    def _plan_refresh(self, due: List[ChannelKey], now: float
+                      ) -> Tuple[List[ChannelKey], Dict[int, List[ChannelKey]]]:
+        """Fällige Kanäle aufteilen in Einzelabfragen und Blockabfragen (Startindex -> Kanäle)."""
+        size = WebControlProtocol.CLIMA_BLOCK_SIZE
+        polls: List[ChannelKey] = []
+        blocks: Dict[int, List[ChannelKey]] = {}
+        for key in due:
+            cli = self.client.states.cli_for(*key)
+            if cli is None or self.wants_poll(key, now):
+                polls.append(key)
+            else:
+                blocks.setdefault(cli - cli % size, []).append(key)
+        return polls, blocks
+
+    def _observe(self, key: ChannelKey) -> None:
+        """Frisch gelesenen Zustand an Poll-Scheduler, Bewegungsmodell und Verlauf geben."""
+        states = self.client.states
+        lastp = states.lastp_at(*key)
+        self.poll_scheduler.record(key, lastp)
+        history = self.history.get(key)
+        if history is not None:
+            cli = states.cli_for(*key)
+            history.observe(time.time(), lastp, states.lastw_at(*key), states.cause_of(cli) if cli is not None else None)
+        cover = self._covers.get(key)
+        if cover is not None:
+            # Auslöser mit der Abfrage auffrischen, nicht beim Lesen des Entity-Zustands
+            self.client.refresh_stale_cause(cover)
+        motion = self.motion.get(key)
+        if motion is not None:
+            now = time.monotonic()
+            motion.observe(lastp, now)
+            eta = motion.eta(now) if motion.calibrated else None
+            if eta is not None:
+                # Fahrzeit bekannt: statt im Schnelltakt erst zur Ankunft wieder fragen
+                self.poll_scheduler.defer(key, eta + MOTION_ARRIVAL_MARGIN, now)
+
+    def _snapshot(self) -> Mapping[ChannelKey, ChannelState]:
+        """Snapshot des State-Stores; geänderte Kanäle über die Versionszähler merken."""
+        snapshot = self.client.states.snapshot()
+        self._changed |= snapshot.changed_since(self.data)
+        return snapshot
+
+    @property
+    def channel_keys(self) -> List[ChannelKey]:
+        return list(self._cli_keys.values())
+
+    @callback
+    def async_mark_pending(self) -> None:
+        """Verzögerter Start: Entities bis zur ersten erfolgreichen Abfrage unavailable."""
+        self.last_update_success = False
+        self._notified_success = False
+
+    @callback
+    def async_enable_streaming(self) -> None:
+        """Auf Streaming umstellen (vor dem Laden der Plattformen, damit kein Intervall geplant wird)."""
+        self.streaming = True
+        self.update_interval = None
+
+    @callback
+    def async_stream_result(self, key: ChannelKey) -> Set[ChannelKey]:
+        """Streaming: Einzelabfrage von ``key`` übernehmen; liefert die geänderten Kanäle.
+
+        Setzt ``data`` ohne Listener-Aufruf; die Entities werden per Dispatcher je Kanal benachrichtigt.
+        """
+        self._observe(key)
+        snapshot = self.client.states.snapshot()
+        changed = snapshot.changed_since(self.data)
+        self.data = snapshot
+        if not self.last_update_success:
+            self.last_update_success = True
+            self.last_exception = None
+            self.logger.info("Verbindung zu %s wiederhergestellt", self.client.base_url)
+            self.async_update_listeners()
+        return changed
+
+    @callback
+    def async_stream_failed(self, exc: Exception) -> None:
+        """Streaming: fehlgeschlagene Abfrage; Entities beim ersten Fehler unavailable setzen."""
+        if self.last_update_success:
+            self.logger.warning("Abfrage von %s fehlgeschlagen: %s", self.client.base_url, exc)
+            self.last_update_success = False
+            self.last_exception = exc
+            self.async_update_listeners()
+
+    @callback
+    def async_add_channels(self, channels: List[ChannelInfo]) -> None:
+        """Neu entdeckte Kanäle ins Polling aufnehmen (sofort fällig)."""
+        for ch in channels:
+            if ch.raumindex is not None and ch.kanalindex is not None:
+                key = (ch.raumindex, ch.kanalindex)
+                self._cli_keys[ch.cli_index] = key
+                self.poll_scheduler.add(key)
+                if ch.type != WebControlProtocol.TYPE_LICHT:
+                    self.motion.setdefault(key, CoverMotion())
+                    self.history.setdefault(key, PositionHistory())
+                    self._covers[key] = ch
+
+    @callback
+    def async_remove_channels(self, channels: List[ChannelInfo]) -> None:
+        for ch in channels:
+            key = (ch.raumindex, ch.kanalindex)
+            self.poll_scheduler.remove(key)
+            self.motion.pop(key, None)
+            self.history.pop(key, None)
+            self._covers.pop(key, None)
+            if self._cli_keys.get(ch.cli_index) == key:
+                del self._cli_keys[ch.cli_index]
+            self.client.states.clear(ch.cli_index)
+
+    @callback
+    def async_on_channel_command(self, raumindex: int, kanalindex: int, fc: int, pos: int) -> None:
+        """Command-Listener des Clients: Bewegungsmodell starten, Kanal schnell pollen."""
+        key = (raumindex, kanalindex)
+        motion = self.motion.get(key)
+        if motion is not None:
+            now = time.monotonic()
+            if fc == WebControlProtocol.FC_STOP:
+                motion.stop(now)
+            elif fc == WebControlProtocol.FC_HOCH:
+                motion.start(0, now)
+            elif fc == WebControlProtocol.FC_TIEF:
+                motion.start(FULL_TRAVEL, now)
+            elif fc == WebControlProtocol.FC_STATE:
+                motion.start(pos * 2, now)
+            # Entity sofort informieren (Richtung/Interpolation), ohne auf den Poll zu warten
+            self._changed.add(key)
+            self.async_update_listeners()
+        self.poll_scheduler.mark_active(key)
+        if not self.streaming:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Nur Listener geänderter Kanäle aufrufen (bzw. alle bei Verfügbarkeitswechsel)."""
+        changed, self._changed = self._changed, set()
+        notify_all = self.last_update_success != self._notified_success
+        self._notified_success = self.last_update_success
+        for update_callback, context in list(self._listeners.values()):
+            if notify_all or context is None or context in changed:
+                update_callback()
@@ -1,13 +1,26 @@
 from __future__ import annotations
-from homeassistant.components.cover import CoverEntity, CoverDeviceClass, CoverEntityFeature, ATTR_POSITION
-from homeassistant.core import HomeAssistant
+import time
+from datetime import timedelta
+
+from homeassistant.components.cover import (
+    CoverEntity, CoverDeviceClass, CoverEntityFeature, ATTR_POSITION, ATTR_TILT_POSITION,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
-from .const import WAREMA_TO_HA_DEVICE_CLASS
+from .const import WAREMA_TO_HA_DEVICE_CLASS, entity_unique_id, signal_channel_changed, signal_channel_update, signal_new_channels
+from .motion import CoverMotion
 
 from . import DOMAIN
 
+# Aktualisierung des interpolierten Stands während einer Fahrt
+MOTION_UPDATE_INTERVAL = timedelta(seconds=1)
+
 class WebControlCover(CoordinatorEntity, CoverEntity):
     _attr_supported_features = (
         CoverEntityFeature.OPEN | CoverEntityFeature.CLOSE |
@@ -16,26 +29,46 @@ class WebControlCover(CoordinatorEntity, CoverEntity):
     _attr_should_poll = False
     _history_max = 20  # max number of history entries to keep
 
-    def __init__(self, hass: HomeAssistant, client, coordinator, ch):
-        super().__init__(coordinator)
+    def __init__(self, hass: HomeAssistant, client, coordinator, ch, entry_id: str, device_info: DeviceInfo):
+        # Kontext = (raum, kanal): der Coordinator ruft uns nur bei Änderungen dieses Kanals
+        super().__init__(coordinator, (ch.raumindex, ch.kanalindex))
         self._client = client
-        self._ch = ch
-        self._attr_name = ch.name or f"Rollladen {ch.cli_index}"
-        self._attr_unique_id = f"webcontrol_cover_{ch.cli_index}"
-        self._attr_device_class = WAREMA_TO_HA_DEVICE_CLASS.get(ch.type, "shutter")
+        self._attr_unique_id = entity_unique_id(entry_id, f"cover_{ch.cli_index}")
         self._position = None
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, "webcontrol")}, name="Warema WebControl"
-        )
-        self._attr_supported_features = (
-            CoverEntityFeature.OPEN | CoverEntityFeature.CLOSE |
-            CoverEntityFeature.STOP | CoverEntityFeature.SET_POSITION)
+        self._attr_device_info = device_info
+        self._entry_id = entry_id
+        self._apply_channel(ch)
         self._last_cause = None  # cliausl Code
 
         self._last_triggered = None
         self._last_command = None
         self._last_direction = None
+        self._direction = None
+        self._unsub_motion = None
+
+
+    def _apply_channel(self, ch) -> None:
+        """Name, Geräteklasse und Features aus dem ChannelInfo übernehmen (auch nach Umbenennung)."""
+        self._ch = ch
+        self._attr_name = ch.name or f"Rollladen {ch.cli_index}"
+        self._attr_device_class = WAREMA_TO_HA_DEVICE_CLASS.get(ch.type, "shutter")
+        self._attr_supported_features = (
+            CoverEntityFeature.OPEN | CoverEntityFeature.CLOSE |
+            CoverEntityFeature.STOP | CoverEntityFeature.SET_POSITION)
+        # Raffstore/Jalousie mit Winkelbereich (minw/maxw): Lamellen steuerbar
+        self._tilt = self._client.supports_tilt(ch)
+        if self._tilt:
+            self._attr_supported_features |= (
+                CoverEntityFeature.OPEN_TILT | CoverEntityFeature.CLOSE_TILT |
+                CoverEntityFeature.STOP_TILT | CoverEntityFeature.SET_TILT_POSITION)
 
+    @callback
+    def _async_channel_changed(self, ch) -> None:
+        """Umbenennung/Typwechsel am Gateway: Entity und Registry-Eintrag in place aktualisieren."""
+        self._apply_channel(ch)
+        er.async_get(self.hass).async_update_entity(
+            self.entity_id, original_name=self._attr_name, original_device_class=self._attr_device_class)
+        self.async_write_ha_state()
 
     def _to_ha_open_percent(self, closed_percent: int | None) -> int | None:
         """Gateway value (0=open, 100=closed) -> HA open% (0=closed, 100=open)."""
@@ -50,89 +83,158 @@ class WebControlCover(CoordinatorEntity, CoverEntity):
         return max(0, min(100, 100 - int(ha_open_percent)))
 
 
-    def open_cover(self, **kwargs):
+    async def async_open_cover(self, **kwargs):
         #self._direction = "opening"
         #self._is_moving = True
         #self._last_command = "open"
         #self._push_history(self._direction)
         #self.schedule_update_ha_state()
         #self._client.cover_open(self._ch)
-        self.set_cover_position(position=100, direction="opening", last_command="open")
+        await self.async_set_cover_position(position=100, direction="opening", last_command="open")
 
-    def close_cover(self, **kwargs):
+    async def async_close_cover(self, **kwargs):
         #self._direction = "closing"
         #self._is_moving = True
         #self._last_command = "close"
         #self._push_history()
         #self.schedule_update_ha_state()
         #self._client.cover_close(self._ch)
-        self.set_cover_position(position=0, direction="closing", last_command="close")
+        await self.async_set_cover_position(position=0, direction="closing", last_command="close")
 
-    def stop_cover(self, **kwargs):
-        #self._direction = "closing"
-        self._is_moving = False
+    async def async_stop_cover(self, **kwargs):
+        self._direction = None
         self._last_command = "stop"
         self._push_history()
-        self.schedule_update_ha_state()
-        self._client.cover_stop(self._ch)
+        self.async_write_ha_state()
+        await self._client.cover_stop(self._ch)
 
-    def set_cover_position(self, **kwargs):
+    async def async_set_cover_position(self, **kwargs):
         pos = kwargs.get("position")
         arg_direction = kwargs.get("direction")
         arg_last_command = kwargs.get("last_command")
         inverted_pos = self._from_ha_open_percent(pos)
         if inverted_pos is not None:
             self._direction = "closing" if self._position is not None and pos < self._position else "opening"
-            self._is_moving = True
             self._last_command = f"set_position {inverted_pos}"
             if arg_direction:
                 self._direction = arg_direction
             if arg_last_command:
                 self._last_command = arg_last_command
             self._push_history()
-            self.schedule_update_ha_state()
-            response = self._client.cover_set_position(self._ch, int(inverted_pos))
-            self._position = int(pos)
-            if response.get("ok"):
-                self._is_moving = False
-                self.schedule_update_ha_state()
+            # Position/Richtung kommen ab jetzt aus dem Bewegungsmodell (Command-Listener des Coordinators)
+            await self._client.cover_set_position(self._ch, int(inverted_pos))
+
+
+    async def async_set_cover_tilt_position(self, **kwargs):
+        tilt = int(kwargs[ATTR_TILT_POSITION])
+        self._last_command = f"set_tilt_position {tilt}"
+        self._push_history()
+        # ein Telegramm: FC_STATE mit Zielposition (laufende Fahrt nicht abbrechen) und neuem Winkel
+        motion = self._motion
+        target = motion.target(time.monotonic()) if motion is not None else None
+        percent = None if target is None else int(round(target / 2))
+        try:
+            await self._client.cover_set_tilt(self._ch, self._client.tilt_to_winkel(self._ch, tilt), percent)
+        except ValueError as exc:
+            raise HomeAssistantError(str(exc)) from exc
 
+    async def async_open_cover_tilt(self, **kwargs):
+        await self.async_set_cover_tilt_position(**{ATTR_TILT_POSITION: 100})
+
+    async def async_close_cover_tilt(self, **kwargs):
+        await self.async_set_cover_tilt_position(**{ATTR_TILT_POSITION: 0})
+
+    async def async_stop_cover_tilt(self, **kwargs):
+        await self.async_stop_cover()
 
     def _push_history(self) -> None:
         self._last_direction = self._direction
         self._last_triggered = dt_util.utcnow().isoformat(timespec="seconds")
 
-    
+    @property
+    def _motion(self) -> CoverMotion | None:
+        return self.coordinator.motion.get(self.coordinator_context)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        super()._handle_coordinator_update()
+        self._async_track_motion()
+
+    @callback
+    def _async_track_motion(self) -> None:
+        """Während der Fahrt jede Sekunde den interpolierten Stand schreiben (ohne Telegramme)."""
+        motion = self._motion
+        moving = motion is not None and motion.direction(time.monotonic()) != 0
+        if moving and self._unsub_motion is None:
+            self._unsub_motion = async_track_time_interval(self.hass, self._async_motion_tick, MOTION_UPDATE_INTERVAL)
+        elif not moving and self._unsub_motion is not None:
+            self._unsub_motion()
+            self._unsub_motion = None
+
+    @callback
+    def _async_motion_tick(self, _now) -> None:
+        self.async_write_ha_state()
+        self._async_track_motion()
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # Streaming-Modus: Änderungen dieses Kanals kommen per Dispatcher statt über den Coordinator
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, signal_channel_update(self._entry_id, *self.coordinator_context),
+            self._handle_coordinator_update))
+        # Umbenennung/Winkelbereich geändert (TopologyWatcher): Entity und Registry-Eintrag bleiben
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, signal_channel_changed(self._entry_id, "cover", self._ch.cli_index),
+            self._async_channel_changed))
+
+    async def async_will_remove_from_hass(self) -> None:
+        if self._unsub_motion is not None:
+            self._unsub_motion()
+            self._unsub_motion = None
+        await super().async_will_remove_from_hass()
+
     @property
     def current_cover_position(self):
-        # Retrieve from coordinator state cache (State‑Cache: {(raum, kanal): {...}})
-        data = self.coordinator.data or {}
-        key = (self._ch.raumindex, self._ch.kanalindex)
-        st = data.get(key)
-        if st and st.get("lastp") is not None:
-            inverted_pos = self._to_ha_open_percent(int(st["lastp"] // 2))
-            self._position = inverted_pos  # 0..200 -> 0..100
-        # Trigger (optional)
-        cause = self._client.cause_cache.get(self._ch.cli_index)
-        if cause:
-            self._last_cause = cause.get("cliausl")
+        # Während der Fahrt: Bewegungsmodell, sonst Coordinator-Snapshot ({(raum, kanal): ChannelState})
+        motion = self._motion
+        now = time.monotonic()
+        lastp = motion.position(now) if motion is not None and motion.direction(now) != 0 else None
+        if lastp is None:
+            data = self.coordinator.data or {}
+            st = data.get(self.coordinator_context)
+            lastp = st.lastp if st else None
+        if lastp is not None:
+            self._position = self._to_ha_open_percent(int(round(lastp / 2)))  # 0..200 -> 0..100
+        # Trigger (optional, vom Coordinator im Hintergrund aktuell gehalten)
+        cause = self._client.states.cause_of(self._ch.cli_index)
+        if cause is not None:
+            self._last_cause = cause
         return self._position
-    
-    
+
+    @property
+    def current_cover_tilt_position(self):
+        if not self._tilt:
+            return None
+        data = self.coordinator.data or {}
+        st = data.get(self.coordinator_context)
+        return self._client.winkel_to_tilt(self._ch, st.lastw if st else None)
+
     @property
     def is_closing(self) -> bool | None:
-        return bool(getattr(self, "_is_moving", False)) and getattr(self, "_direction", None) == "closing"
-    
+        motion = self._motion
+        return motion is not None and motion.direction(time.monotonic()) > 0
+
     @property
     def is_opening(self) -> bool | None:
-        return bool(getattr(self, "_is_moving", False)) and getattr(self, "_direction", None) == "opening"
-    
+        motion = self._motion
+        return motion is not None and motion.direction(time.monotonic()) < 0
+
     @property
     def is_closed(self) -> bool | None:
         """Return if the cover is closed."""
         pos = getattr(self, "_position", None)
         return None if pos is None else pos == 0
-        
+
 
 
     @property
@@ -148,20 +250,18 @@ class WebControlCover(CoordinatorEntity, CoverEntity):
 
 
 async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities):
-    data = hass.data[DOMAIN]
+    data = hass.data[DOMAIN][entry.entry_id]
     client = data["client"]
     coordinator = data["coordinator"]
+    device_info = data["device_info"]
     covers = data["mapped"]["cover"]
-    entities = [WebControlCover(hass, client, coordinator, ch) for ch in covers]
+    entities = [WebControlCover(hass, client, coordinator, ch, entry.entry_id, device_info) for ch in covers]
     async_add_entities(entities)
 
-async def async_update(self):
-    data = self._client.poll_state(self._room_index, self._ch.kanalindex)
-    if data:
-        pos = data.get("lastp")
-        if pos is not None:
-            self._position = int(pos // 2)
-        cause = self._client.cause_cache.get(self._ch.cli_index)
-        if cause:
-            self._last_cause = cause.get("cliausl")
-    self.async_write_ha_state()
+    @callback
+    def _async_add_new(channels):
+        async_add_entities([WebControlCover(hass, client, coordinator, ch, entry.entry_id, device_info) for ch in channels])
+
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, signal_new_channels(entry.entry_id, "cover"), _async_add_new)
+    )
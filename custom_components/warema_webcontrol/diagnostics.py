@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Diagnose-Download: Gateway-Status, Polling und Protokoll-Kennzahlen."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    client = data["client"]
+    coordinator = data["coordinator"]
+    return {
+        "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+        "gateway": {
+            "base_url": client.base_url,
+            "language": client.language,
+            "sommer_winter_aktiv": client.sommer_winter_aktiv,
+            "clima_check_erfolg": client.clima_check_erfolg,
+        },
+        "channels": {kind: len(chs) for kind, chs in data["mapped"].items()},
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval_s": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+            "streaming": coordinator.streaming,
+            "learned_travel_time_s": {
+                f"{r}/{k}": round(m.travel_time, 2) for (r, k), m in coordinator.motion.items() if m.calibrated
+            },
+        },
+        "health": client.health.as_dict(),
+        "metrics": client.metrics.as_dict(),
+        "learned_busy_s": {
+            client.metrics.telegram_name(tel): round(sec, 3) for tel, sec in client.backoff.learned().items()
+        },
+    }
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+
+from .async_client import AsyncWebControlClient
+from .const import DISCOVERY_INTERVAL, DOMAIN, entity_unique_id, signal_channel_changed, signal_new_channels
+from .coordinator import WebControlCoordinator
+from .topology import TopologyCache
+from .webcontrol_client import ChannelInfo
+
+_LOGGER = logging.getLogger(__name__)
+
+# Plattform -> HA-Domain der Entities (für die Entity-Registry)
+PLATFORM_DOMAINS = {"cover": "cover", "light": "light"}
+
+
+class TopologyWatcher:
+    """Hintergrund-Discovery: erkennt neue/geänderte/entfernte Kanäle ohne Neustart.
+
+    ``TEL_CHECK_CLIMA_DATA`` dient als günstiger Änderungshinweis; nur wenn
+    sich ``erfolg`` ändert, wird ``rediscover`` ausgeführt. Entities werden
+    über ``signal_new_channels`` hinzugefügt, bei Umbenennung aktualisiert
+    bzw. aus der Registry entfernt, wenn der Kanal nicht mehr existiert.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, client: AsyncWebControlClient,
+                 coordinator: WebControlCoordinator, topology_cache: TopologyCache, init: dict,
+                 clima_check_erfolg: Optional[int]):
+        self.hass = hass
+        self.entry = entry
+        self.client = client
+        self.coordinator = coordinator
+        self.topology_cache = topology_cache
+        self._channels: List[ChannelInfo] = init["channels_all"]
+        self._rooms = dict(init["rooms"])
+        self._mapped: Dict[str, List[ChannelInfo]] = init["channels_mapped"]
+        self._clima_check_erfolg = clima_check_erfolg
+
+    @callback
+    def async_start(self, check_now: bool) -> None:
+        """Alle DISCOVERY_INTERVAL Sekunden prüfen; ``check_now`` (Topologie aus dem Cache) prüft sofort."""
+        if check_now:
+            self.entry.async_create_background_task(self.hass, self.async_check(), "warema_webcontrol_discovery")
+        self.entry.async_on_unload(
+            async_track_time_interval(self.hass, self._async_tick, timedelta(seconds=DISCOVERY_INTERVAL))
+        )
+
+    async def _async_tick(self, _now=None) -> None:
+        await self.async_check()
+
+    async def async_check(self) -> None:
+        client = self.client
+        try:
+            await client.check_clima_data()
+            if client.clima_check_erfolg is None or client.clima_check_erfolg == self._clima_check_erfolg:
+                return
+            channels, rooms, changed = await client.rediscover(self._channels, self._rooms)
+        except Exception as exc:
+            _LOGGER.warning("Topologie-Abgleich mit %s fehlgeschlagen: %s", client.base_url, exc)
+            return
+
+        init = client.map_channels(channels, rooms)
+        init["clima_check_erfolg"] = client.clima_check_erfolg
+        await self.topology_cache.async_save(client.base_url, client.export_topology(init))
+        if changed:
+            _LOGGER.info("Topologie von %s geändert (cli %s)", client.base_url, sorted(changed))
+        self.async_adopt(init)
+
+    @callback
+    def async_adopt(self, init: dict) -> None:
+        """Neues ``initialize``-/``map_channels``-Ergebnis übernehmen (auch beim verzögerten Start)."""
+        self._clima_check_erfolg = init["clima_check_erfolg"]
+        self._channels, self._rooms = init["channels_all"], dict(init["rooms"])
+        self._apply(init["channels_mapped"])
+
+    def _entity_id(self, registry: er.EntityRegistry, platform_domain: str, kind: str,
+                   ch: ChannelInfo) -> Optional[str]:
+        return registry.async_get_entity_id(
+            platform_domain, DOMAIN, entity_unique_id(self.entry.entry_id, f"{kind}_{ch.cli_index}")
+        )
+
+    @callback
+    def _apply(self, mapped: Dict[str, List[ChannelInfo]]) -> None:
+        """Entity-Änderungen aus dem neuen Mapping ableiten und umsetzen.
+
+        Neue Kanäle kommen per ``signal_new_channels`` hinzu, umbenannte bzw.
+        geänderte werden in place aktualisiert (Registry-Eintrag mit
+        Nutzeranpassungen bleibt). Wandert ein Kanal auf anderen Raum/Kanal,
+        wird der Eintrag neu geladen (Coordinator-Kontext der Entity ändert sich).
+        Nur Kanäle, die es auf der Plattform nicht mehr gibt, werden aus der
+        Registry entfernt.
+        """
+        registry = er.async_get(self.hass)
+        moved = False
+        for kind, platform_domain in PLATFORM_DOMAINS.items():
+            old = {ch.cli_index: ch for ch in self._mapped.get(kind, [])}
+            new = {ch.cli_index: ch for ch in mapped.get(kind, [])}
+            kept = [cli for cli in new if cli in old]
+            moved = moved or any(
+                (old[cli].raumindex, old[cli].kanalindex) != (new[cli].raumindex, new[cli].kanalindex) for cli in kept
+            )
+            changed = [new[cli] for cli in kept
+                       if self.client.channel_signature(old[cli]) != self.client.channel_signature(new[cli])]
+            removed = [old[cli] for cli in old if cli not in new]
+            added = [new[cli] for cli in new if cli not in old]
+
+            if removed:
+                self.coordinator.async_remove_channels(removed)
+                for ch in removed:
+                    entity_id = self._entity_id(registry, platform_domain, kind, ch)
+                    if entity_id:
+                        registry.async_remove(entity_id)
+            # Liste in place ersetzen: Dienste lesen hass.data[DOMAIN][entry_id]["mapped"]
+            self._mapped.setdefault(kind, [])[:] = mapped.get(kind, [])
+            if moved:
+                continue
+            for ch in changed:
+                # Entity übernimmt das neue ChannelInfo und aktualisiert ihren Registry-Eintrag selbst
+                async_dispatcher_send(self.hass, signal_channel_changed(self.entry.entry_id, kind, ch.cli_index), ch)
+            if added:
+                self.coordinator.async_add_channels(added)
+                async_dispatcher_send(self.hass, signal_new_channels(self.entry.entry_id, kind), added)
+        if moved:
+            # Topologie ist gespeichert; das Neuladen baut Entities mit neuem (raum, kanal) aus dem Cache auf
+            _LOGGER.info("Kanäle von %s auf andere Räume verschoben, lade neu", self.client.base_url)
+            self.hass.config_entries.async_schedule_reload(self.entry.entry_id)
+            return
+        if not self.coordinator.streaming and self.coordinator.poll_scheduler.due():
+            self.hass.async_create_task(self.coordinator.async_request_refresh())
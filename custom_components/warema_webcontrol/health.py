@@ -0,0 +1,99 @@
+from __future__ import annotations
+import time
+from typing import Callable, List, Optional
+
+CLOSED = "closed"        # normaler Betrieb
+OPEN = "open"            # Gateway gilt als weg: Telegramme werden sofort abgelehnt
+HALF_OPEN = "half_open"  # ein Probe-Telegramm ist unterwegs
+
+
+class GatewayUnavailable(ConnectionError):
+    """Circuit offen: Telegramm wurde ohne Netzwerkzugriff abgelehnt."""
+
+
+class CircuitBreaker:
+    """Verbindungszustand eines Gateways (Circuit Breaker).
+
+    Nach ``failure_threshold`` Verbindungsfehlern in Folge öffnet der Circuit:
+    ``allow`` lehnt ab, statt jedes Telegramm in den Timeout laufen zu lassen.
+    Nach ``reset_timeout`` lässt ``allow`` genau ein Telegramm als Probe durch
+    (half-open); Erfolg schließt den Circuit, ein Fehler öffnet ihn erneut mit
+    verdoppelter Wartezeit (bis ``max_reset_timeout``). Listener erhalten
+    ``True``/``False`` bei jedem Wechsel der Verfügbarkeit.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 5.0,
+                 max_reset_timeout: float = 60.0, factor: float = 2.0, probe_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.min_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.factor = factor
+        self.probe_timeout = probe_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self.reset_timeout = reset_timeout
+        self._opened_at = 0.0
+        self._probe_at = 0.0
+        self._listeners: List[Callable[[bool], None]] = []
+
+    @property
+    def available(self) -> bool:
+        return self.state == CLOSED
+
+    def add_listener(self, listener: Callable[[bool], None]) -> Callable[[], None]:
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _notify(self, available: bool) -> None:
+        for listener in list(self._listeners):
+            listener(available)
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """Darf ein Telegramm gesendet werden? Im Zustand open ggf. als Probe."""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic() if now is None else now
+        if self.state == OPEN and now >= self._opened_at + self.reset_timeout:
+            self.state = HALF_OPEN
+            self._probe_at = now
+            return True
+        if self.state == HALF_OPEN and now >= self._probe_at + self.probe_timeout:
+            # Probe ohne Ergebnis (abgebrochen): neue Probe zulassen
+            self._probe_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def seconds_until_probe(self, now: Optional[float] = None) -> float:
+        if self.state != OPEN:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._opened_at + self.reset_timeout - now)
+
+    def record_success(self) -> None:
+        self.failures = 0
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self.reset_timeout = self.min_reset_timeout
+            self._notify(True)
+
+    def record_failure(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.state = OPEN
+            self._opened_at = now
+            self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * self.factor)
+        elif self.state == CLOSED and self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self._opened_at = now
+            self._notify(False)
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+            "reset_timeout_s": self.reset_timeout,
+        }
@@ -0,0 +1,89 @@
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, NamedTuple, Optional
+
+RAW_CAPACITY = 256       # letzte Zustandswechsel je Kanal in voller Auflösung
+BUCKET_SECONDS = 300     # Downsampling-Raster
+BUCKET_CAPACITY = 288    # 24 h bei 5 min
+
+
+class HistorySample(NamedTuple):
+    t: float                 # Unix-Zeit
+    lastp: Optional[int]
+    lastw: Optional[int]
+    cause: Optional[int]
+
+
+@dataclass(slots=True)
+class HistoryBucket:
+    start: float
+    min_lastp: int
+    max_lastp: int
+    last_lastp: int
+    moves: int = 0
+    samples: int = 0
+
+
+class PositionHistory:
+    """Positionsverlauf eines Kanals im Speicher (statt Recorder-Abfragen).
+
+    ``observe`` wird bei jeder Abfrage aufgerufen. Zustandswechsel landen im
+    Ringpuffer (``RAW_CAPACITY``), jede Abfrage zusätzlich im aktuellen
+    Zeitbucket (min/max/letzter Wert, Anzahl Fahrten). Eine Fahrt zählt, wenn
+    sich ``lastp`` nach mindestens einer unveränderten Abfrage wieder ändert.
+    """
+
+    def __init__(self, raw_capacity: int = RAW_CAPACITY, bucket_seconds: float = BUCKET_SECONDS,
+                 bucket_capacity: int = BUCKET_CAPACITY):
+        self.bucket_seconds = bucket_seconds
+        self.samples: Deque[HistorySample] = deque(maxlen=raw_capacity)
+        self.buckets: Deque[HistoryBucket] = deque(maxlen=bucket_capacity)
+        self._moving = False
+
+    def observe(self, t: float, lastp: Optional[int], lastw: Optional[int], cause: Optional[int]) -> None:
+        last = self.samples[-1] if self.samples else None
+        if last is None or (last.lastp, last.lastw, last.cause) != (lastp, lastw, cause):
+            self.samples.append(HistorySample(t, lastp, lastw, cause))
+        if lastp is None:
+            return
+        moved = last is not None and last.lastp is not None and lastp != last.lastp
+        bucket = self._bucket(t, lastp)
+        if moved and not self._moving:
+            bucket.moves += 1
+        self._moving = moved
+        bucket.samples += 1
+        bucket.min_lastp = min(bucket.min_lastp, lastp)
+        bucket.max_lastp = max(bucket.max_lastp, lastp)
+        bucket.last_lastp = lastp
+
+    def _bucket(self, t: float, lastp: int) -> HistoryBucket:
+        start = t - t % self.bucket_seconds
+        if not self.buckets or self.buckets[-1].start < start:
+            self.buckets.append(HistoryBucket(start, lastp, lastp, lastp))
+        return self.buckets[-1]
+
+    # ---------- Abfragen ----------
+    def samples_since(self, since: float) -> List[HistorySample]:
+        """Zustandswechsel ab ``since`` plus der davor gültige Zustand (Startwert der Kurve)."""
+        result: List[HistorySample] = []
+        for sample in reversed(self.samples):
+            result.append(sample)
+            if sample.t <= since:
+                break
+        result.reverse()
+        return result
+
+    def buckets_since(self, since: float) -> List[HistoryBucket]:
+        start = since - since % self.bucket_seconds
+        return [b for b in self.buckets if b.start >= start]
+
+    def moves_since(self, since: float) -> int:
+        """Anzahl Fahrten ab ``since`` (Auflösung: ein Bucket)."""
+        return sum(b.moves for b in self.buckets_since(since))
+
+    def lastp_at(self, t: float) -> Optional[int]:
+        for sample in reversed(self.samples):
+            if sample.t <= t:
+                return sample.lastp
+        return None
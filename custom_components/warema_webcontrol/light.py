@@ -1,51 +1,78 @@
 from __future__ import annotations
 from homeassistant.components.light import LightEntity, ColorMode
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import DOMAIN
+from .const import entity_unique_id, signal_channel_changed, signal_channel_update, signal_new_channels
 
 class WebControlLight(CoordinatorEntity, LightEntity):
     _attr_should_poll = False
     _attr_supported_color_modes = {ColorMode.ONOFF}
     _attr_color_mode = ColorMode.ONOFF
 
-    def __init__(self, hass: HomeAssistant, client, coordinator, ch):
-        super().__init__(coordinator)
+    def __init__(self, hass: HomeAssistant, client, coordinator, ch, entry_id: str, device_info: DeviceInfo):
+        super().__init__(coordinator, (ch.raumindex, ch.kanalindex))
         self._client = client
         self._ch = ch
         self._attr_name = ch.name or f"Licht {ch.cli_index}"
-        self._attr_unique_id = f"webcontrol_light_{ch.cli_index}"
+        self._attr_unique_id = entity_unique_id(entry_id, f"light_{ch.cli_index}")
         self._is_on = False
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, "webcontrol")}, name="Warema WebControl"
-        )
+        self._attr_device_info = device_info
+        self._entry_id = entry_id
 
-    def turn_on(self, **kwargs):
-        self._client.light_on(self._ch)
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # Streaming-Modus: Änderungen dieses Kanals kommen per Dispatcher statt über den Coordinator
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, signal_channel_update(self._entry_id, *self.coordinator_context),
+            self._handle_coordinator_update))
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass, signal_channel_changed(self._entry_id, "light", self._ch.cli_index),
+            self._async_channel_changed))
+
+    @callback
+    def _async_channel_changed(self, ch) -> None:
+        self._ch = ch
+        self._attr_name = ch.name or f"Licht {ch.cli_index}"
+        er.async_get(self.hass).async_update_entity(self.entity_id, original_name=self._attr_name)
+        self.async_write_ha_state()
+
+    async def async_turn_on(self, **kwargs):
+        await self._client.light_on(self._ch)
         self._is_on = True
 
-    def turn_off(self, **kwargs):
-        self._client.light_off(self._ch)
+    async def async_turn_off(self, **kwargs):
+        await self._client.light_off(self._ch)
         self._is_on = False
 
     @property
     def is_on(self):
         data = self.coordinator.data or {}
-        key = (self._ch.raumindex, self._ch.kanalindex)
-        st = data.get(key)
-        if st and st.get("lastp") is not None:
-            self._is_on = (st["lastp"] >= 200)
+        st = data.get(self.coordinator_context)
+        if st and st.lastp is not None:
+            self._is_on = (st.lastp >= 200)
         return self._is_on
 
 
 
 async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities):
-    data = hass.data[DOMAIN]
+    data = hass.data[DOMAIN][entry.entry_id]
     client = data["client"]
     coordinator = data["coordinator"]
+    device_info = data["device_info"]
     lights = data["mapped"]["light"]
-    entities = [WebControlLight(hass, client, coordinator, ch) for ch in lights]
+    entities = [WebControlLight(hass, client, coordinator, ch, entry.entry_id, device_info) for ch in lights]
     async_add_entities(entities)
 
+    @callback
+    def _async_add_new(channels):
+        async_add_entities([WebControlLight(hass, client, coordinator, ch, entry.entry_id, device_info) for ch in channels])
+
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, signal_new_channels(entry.entry_id, "light"), _async_add_new)
+    )
+
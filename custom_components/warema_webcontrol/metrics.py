@@ -0,0 +1,128 @@
+from __future__ import annotations
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Obergrenzen der Histogramm-Buckets in Millisekunden (letzter Bucket: alles darüber)
+BUCKETS_MS: List[float] = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+@dataclass
+class LatencyHistogram:
+    """Histogramm mit festen Buckets; speicherarm, Quantile als Bucket-Obergrenze."""
+    counts: List[int] = field(default_factory=lambda: [0] * (len(BUCKETS_MS) + 1))
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    @property
+    def mean_ms(self) -> Optional[float]:
+        return self.total_ms / self.count if self.count else None
+
+    def quantile_ms(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return BUCKETS_MS[idx] if idx < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean_ms, 3) if self.count else None,
+            "p50_ms": self.quantile_ms(0.5),
+            "p99_ms": self.quantile_ms(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets_ms": dict(zip([str(b) for b in BUCKETS_MS] + ["inf"], self.counts)),
+        }
+
+
+@dataclass
+class TelegramStats:
+    sent: int = 0
+    retries: int = 0
+    busy: int = 0
+    counter_mismatch: int = 0
+    errors: int = 0
+    rtt: LatencyHistogram = field(default_factory=LatencyHistogram)
+    parse: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def as_dict(self) -> dict:
+        return {
+            "sent": self.sent,
+            "retries": self.retries,
+            "busy": self.busy,
+            "counter_mismatch": self.counter_mismatch,
+            "errors": self.errors,
+            "rtt": self.rtt.as_dict(),
+            "parse": self.parse.as_dict(),
+        }
+
+
+class ProtocolMetrics:
+    """Zähler und Histogramme je Telegrammtyp für ``_send``/``_http_get``."""
+
+    def __init__(self, names: Optional[Dict[int, str]] = None):
+        self._names = names or {}
+        self.telegrams: Dict[int, TelegramStats] = {}
+        self.lock_wait = LatencyHistogram()
+
+    def telegram_name(self, tel: int) -> str:
+        return self._names.get(tel, str(tel))
+
+    def stats(self, tel: int) -> TelegramStats:
+        st = self.telegrams.get(tel)
+        if st is None:
+            st = self.telegrams[tel] = TelegramStats()
+        return st
+
+    def _total(self, attr: str) -> int:
+        return sum(getattr(st, attr) for st in self.telegrams.values())
+
+    @property
+    def sent(self) -> int:
+        return self._total("sent")
+
+    @property
+    def retries(self) -> int:
+        return self._total("retries")
+
+    @property
+    def busy(self) -> int:
+        return self._total("busy")
+
+    @property
+    def counter_mismatch(self) -> int:
+        return self._total("counter_mismatch")
+
+    @property
+    def errors(self) -> int:
+        return self._total("errors")
+
+    def mean_ms(self, attr: str) -> Optional[float]:
+        """Mittelwert über alle Telegrammtypen (``attr``: "rtt" oder "parse")."""
+        count = sum(getattr(st, attr).count for st in self.telegrams.values())
+        if not count:
+            return None
+        return sum(getattr(st, attr).total_ms for st in self.telegrams.values()) / count
+
+    def as_dict(self) -> dict:
+        return {
+            "lock_wait": self.lock_wait.as_dict(),
+            "telegrams": {
+                self.telegram_name(tel): st.as_dict()
+                for tel, st in sorted(self.telegrams.items())
+            },
+        }
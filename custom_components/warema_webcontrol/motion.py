@@ -0,0 +1,114 @@
+from __future__ import annotations
+from typing import Optional, Tuple
+
+FULL_TRAVEL = 200           # lastp-Spanne: 0 = offen, 200 = geschlossen
+DEFAULT_TRAVEL_TIME = 30.0  # Sekunden für eine komplette Fahrt, bis gelernt
+MIN_TRAVEL_TIME = 3.0       # Messungen außerhalb dieses Bereichs werden verworfen
+MAX_TRAVEL_TIME = 300.0
+
+
+class CoverMotion:
+    """Bewegungsmodell eines Behangs: schätzt ``lastp`` zwischen zwei Abfragen.
+
+    Ein Fahrbefehl (``start``) setzt das Ziel; bis zur nächsten Abfrage wird
+    mit der gelernten Fahrzeit linear interpoliert. Jede Abfrage (``observe``)
+    setzt den Anker neu. Zwei aufeinanderfolgende Abfragen während einer Fahrt
+    kalibrieren die Fahrzeit (EWMA). Bewegungen ohne bekannten Befehl
+    (Automatik, Handsender) werden höchstens ``horizon`` Sekunden über die
+    letzte Abfrage hinaus fortgeschrieben.
+    """
+
+    def __init__(self, travel_time: float = DEFAULT_TRAVEL_TIME, alpha: float = 0.3, horizon: float = 4.0):
+        self.travel_time = travel_time
+        self.calibrated = False
+        self.alpha = alpha
+        self.horizon = horizon
+        self._anchor_p: Optional[float] = None
+        self._anchor_t = 0.0
+        self._target: Optional[float] = None   # None: steht
+        self._open_ended = False                # Ziel nur vermutet (keine Befehlsdaten)
+        self._since = 0.0                       # Beginn der aktuellen Fahrt
+        self._sample: Optional[Tuple[float, int]] = None  # letzte Abfrage (t, lastp)
+
+    @property
+    def rate(self) -> float:
+        """lastp-Einheiten pro Sekunde."""
+        return FULL_TRAVEL / self.travel_time
+
+    def position(self, now: float) -> Optional[float]:
+        """Geschätztes lastp (0..200) oder None, solange nichts bekannt ist."""
+        if self._anchor_p is None or self._target is None:
+            return self._anchor_p
+        elapsed = now - self._anchor_t
+        if self._open_ended:
+            elapsed = min(elapsed, self.horizon)
+        step = self.rate * elapsed
+        if self._target >= self._anchor_p:
+            return min(self._target, self._anchor_p + step)
+        return max(self._target, self._anchor_p - step)
+
+    def direction(self, now: float) -> int:
+        """+1 schließt, -1 öffnet, 0 steht (bzw. Ziel laut Modell erreicht)."""
+        p = self.position(now)
+        if self._target is None or p is None or p == self._target:
+            return 0
+        return 1 if self._target > p else -1
+
+    def target(self, now: float) -> Optional[float]:
+        """Ziel-lastp der laufenden Fahrt (None, wenn sie steht oder das Ziel nur vermutet ist)."""
+        if self._open_ended or self.direction(now) == 0:
+            return None
+        return self._target
+
+    def eta(self, now: float) -> Optional[float]:
+        """Sekunden bis zum Ziel eines Befehls (None ohne Befehl oder Position)."""
+        p = self.position(now)
+        if self._target is None or self._open_ended or p is None:
+            return None
+        return abs(self._target - p) / self.rate
+
+    # ---------- Ereignisse ----------
+    def start(self, target: int, now: float) -> None:
+        """Fahrbefehl an ``target`` (lastp) gesendet."""
+        self._anchor_p = self.position(now)
+        self._anchor_t = now
+        self._target = float(max(0, min(FULL_TRAVEL, target)))
+        self._open_ended = False
+        self._since = now
+
+    def stop(self, now: float) -> None:
+        self._anchor_p = self.position(now)
+        self._anchor_t = now
+        self._target = None
+
+    def observe(self, lastp: Optional[int], now: float) -> None:
+        """Ergebnis einer Abfrage: Anker setzen, Fahrzeit lernen, Ende/Fremdbewegung erkennen."""
+        if lastp is None:
+            return
+        prev, self._sample = self._sample, (now, lastp)
+        moving_before = self._target is not None
+        if prev is not None and lastp != prev[1]:
+            if not moving_before:
+                # Bewegung ohne Befehl: Richtung aus der Änderung, Ziel unbekannt
+                self._target = float(FULL_TRAVEL if lastp > prev[1] else 0)
+                self._open_ended = True
+                self._since = now
+            elif prev[0] >= self._since and lastp != self._target:
+                # beide Abfragen mitten in derselben Fahrt -> Geschwindigkeit messen
+                self._learn((now - prev[0]) * FULL_TRAVEL / abs(lastp - prev[1]))
+        elif prev is not None and moving_before and prev[0] >= self._since:
+            # seit der letzten Abfrage (nach Fahrtbeginn) unverändert: steht
+            self._target = None
+        if self._target is not None and lastp == self._target:
+            self._target = None
+        self._anchor_p = float(lastp)
+        self._anchor_t = now
+
+    def _learn(self, travel_time: float) -> None:
+        if not MIN_TRAVEL_TIME <= travel_time <= MAX_TRAVEL_TIME:
+            return
+        if self.calibrated:
+            self.travel_time += self.alpha * (travel_time - self.travel_time)
+        else:
+            self.travel_time = travel_time
+            self.calibrated = True
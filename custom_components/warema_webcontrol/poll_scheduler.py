@@ -0,0 +1,78 @@
+from __future__ import annotations
+import time
+from typing import Dict, Hashable, List, Optional
+
+
+class AdaptivePollScheduler:
+    """Per-Kanal-Pollintervalle: schnell während einer Bewegung, dann exponentiell bis zum Ruheintervall.
+
+    Ein Kanal wird "aktiv", wenn ein Fahrbefehl an ihn ging (``mark_active``)
+    oder sich ``lastp`` seit der letzten Abfrage geändert hat. Ohne Änderung
+    verdoppelt sich das Intervall bis ``idle_interval``.
+    """
+
+    def __init__(self, fast_interval: float, idle_interval: float, factor: float = 2.0):
+        self.fast_interval = fast_interval
+        self.idle_interval = max(idle_interval, fast_interval)
+        self.factor = factor
+        self._interval: Dict[Hashable, float] = {}
+        self._next: Dict[Hashable, float] = {}
+        self._lastp: Dict[Hashable, Optional[int]] = {}
+
+    def add(self, key: Hashable, now: Optional[float] = None) -> None:
+        """Neuen Kanal aufnehmen; er ist sofort fällig."""
+        now = time.monotonic() if now is None else now
+        self._interval.setdefault(key, self.idle_interval)
+        self._next.setdefault(key, now)
+        self._lastp.setdefault(key, None)
+
+    def remove(self, key: Hashable) -> None:
+        self._interval.pop(key, None)
+        self._next.pop(key, None)
+        self._lastp.pop(key, None)
+
+    def due(self, now: Optional[float] = None) -> List[Hashable]:
+        now = time.monotonic() if now is None else now
+        return [key for key, t in self._next.items() if t <= now]
+
+    def is_active(self, key: Hashable) -> bool:
+        """True, solange der Kanal noch nicht im Ruheintervall angekommen ist."""
+        interval = self._interval.get(key)
+        return interval is not None and interval < self.idle_interval
+
+    def mark_active(self, key: Hashable, now: Optional[float] = None) -> None:
+        """Nach einem Fahrbefehl: Kanal im schnellen Intervall abfragen."""
+        if key not in self._next:
+            return
+        now = time.monotonic() if now is None else now
+        self._interval[key] = self.fast_interval
+        self._next[key] = now + self.fast_interval
+
+    def defer(self, key: Hashable, delay: float, now: Optional[float] = None) -> None:
+        """Nächste Abfrage auf ``delay`` Sekunden setzen (z. B. erwartete Ankunft laut Bewegungsmodell)."""
+        if key not in self._next:
+            return
+        now = time.monotonic() if now is None else now
+        self._next[key] = now + min(self.idle_interval, max(self.fast_interval, delay))
+
+    def record(self, key: Hashable, lastp: Optional[int], now: Optional[float] = None) -> None:
+        """Ergebnis einer Abfrage eintragen und nächsten Termin festlegen."""
+        if key not in self._next:
+            return
+        now = time.monotonic() if now is None else now
+        previous = self._lastp[key]
+        if lastp is not None and previous is not None and lastp != previous:
+            interval = self.fast_interval
+        else:
+            interval = min(self.idle_interval, self._interval[key] * self.factor)
+        self._lastp[key] = lastp
+        self._interval[key] = interval
+        self._next[key] = now + interval
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        """Zeit bis zum nächsten fälligen Kanal, begrenzt auf [fast_interval, idle_interval]."""
+        if not self._next:
+            return self.idle_interval
+        now = time.monotonic() if now is None else now
+        wait = min(self._next.values()) - now
+        return min(self.idle_interval, max(self.fast_interval, wait))
@@ -0,0 +1,143 @@
+from __future__ import annotations
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+# Prioritätsklassen (kleiner = wichtiger)
+PRIO_COMMAND = 0   # Bedienung durch Benutzer/Automationen
+PRIO_CAUSE = 1     # Auslöser-Abfragen
+PRIO_POLL = 2      # Polling, Discovery, sonstige Hintergrundarbeit
+
+MAX_INFLIGHT = 8   # gleichzeitig offene Telegramme über alle Gateways
+
+
+@dataclass
+class _Waiter:
+    priority: int
+    seq: int
+    future: asyncio.Future
+    passed: int = 0
+
+
+class GatewayScheduler:
+    """Prioritäts-Lock vor dem Gateway: genau ein Telegramm gleichzeitig.
+
+    Ersetzt das ``asyncio.Lock`` im ``AsyncWebControlClient``. Wird der Slot
+    frei, kommt der Wartende mit der höchsten Priorität dran (bei Gleichstand
+    der älteste). Da ``_send`` den Slot je Telegramm belegt, schiebt sich ein
+    Befehl zwischen zwei Polls einer laufenden Runde. Damit Hintergrundarbeit
+    nicht verhungert, wird ein Wartender nach ``starvation_limit``
+    Überholungen bevorzugt.
+
+    ``capacity`` > 1 erlaubt mehrere gleichzeitige Slots (globale Spur im
+    ``SchedulerHub``); mit ``parent`` wird nach dem eigenen zusätzlich ein
+    Slot des übergeordneten Schedulers belegt.
+    """
+
+    def __init__(self, starvation_limit: int = 8, capacity: int = 1,
+                 parent: Optional[GatewayScheduler] = None):
+        self.starvation_limit = starvation_limit
+        self.capacity = capacity
+        self._parent = parent
+        self._active = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIO_POLL) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: int = PRIO_POLL) -> None:
+        await self._acquire_local(priority)
+        if self._parent is not None:
+            try:
+                await self._parent.acquire(priority)
+            except BaseException:
+                self._release_local()
+                raise
+
+    def release(self) -> None:
+        if self._parent is not None:
+            self._parent.release()
+        self._release_local()
+
+    async def _acquire_local(self, priority: int) -> None:
+        if self._active < self.capacity and not self._waiters:
+            self._active += 1
+            return
+        waiter = _Waiter(priority, next(self._seq), asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Slot wurde schon zugeteilt -> weitergeben
+                self._release_local()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release_local(self) -> None:
+        while self._waiters:
+            starving = [w for w in self._waiters if w.passed >= self.starvation_limit]
+            if starving:
+                nxt = min(starving, key=lambda w: w.seq)
+            else:
+                nxt = min(self._waiters, key=lambda w: (w.priority, w.seq))
+            self._waiters.remove(nxt)
+            if nxt.future.done():
+                continue
+            for w in self._waiters:
+                if w.priority > nxt.priority:
+                    w.passed += 1
+            # Slot geht direkt an den Wartenden über (_active bleibt)
+            nxt.future.set_result(None)
+            return
+        self._active -= 1
+
+
+class SchedulerHub:
+    """Gemeinsamer Scheduler aller Gateways einer HA-Instanz.
+
+    Jedes Gateway (Basis-URL) bekommt eine eigene ``GatewayScheduler``-Spur
+    und bleibt damit seriell; verschiedene Gateways senden parallel. Alle
+    Spuren hängen an einer globalen Spur mit ``max_inflight`` Slots, die den
+    geteilten Verbindungs-Pool vor zu vielen gleichzeitigen Anfragen schützt
+    und dabei ebenfalls nach Priorität vergibt.
+    """
+
+    def __init__(self, max_inflight: int = MAX_INFLIGHT, starvation_limit: int = 8):
+        self.starvation_limit = starvation_limit
+        self._global = GatewayScheduler(starvation_limit, capacity=max_inflight)
+        self._lanes: Dict[str, GatewayScheduler] = {}
+        self._refs: Dict[str, int] = {}
+
+    def lane(self, key: str) -> GatewayScheduler:
+        """Spur für ein Gateway holen (Referenzzählung, Gegenstück: ``release_lane``)."""
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = GatewayScheduler(self.starvation_limit, parent=self._global)
+        self._refs[key] = self._refs.get(key, 0) + 1
+        return lane
+
+    def release_lane(self, key: str) -> None:
+        refs = self._refs.get(key, 0) - 1
+        if refs > 0:
+            self._refs[key] = refs
+        else:
+            self._refs.pop(key, None)
+            self._lanes.pop(key, None)
+
+    @property
+    def lanes(self) -> int:
+        return len(self._lanes)
@@ -1,8 +1,17 @@
 from __future__ import annotations
-from homeassistant.components.sensor import SensorEntity
+from datetime import timedelta
+from typing import Callable, Optional
+
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from . import DOMAIN
+from .const import entity_unique_id
+from .metrics import ProtocolMetrics
+
+# Kennzahlen liegen im Speicher; Abfrage kostet keine Telegramme
+SCAN_INTERVAL = timedelta(seconds=60)
 
 LANG_MAP = {
     0: "Deutsch",
@@ -15,18 +24,21 @@ LANG_MAP = {
 class WebControlLanguageSensor(SensorEntity):
     _attr_icon = "mdi:translate"
 
-    def __init__(self, client):
+    def __init__(self, client, entry_id: str, device_info: DeviceInfo):
         self._client = client
         self._attr_name = "WebControl Sprache"
-        self._attr_unique_id = "webcontrol_language"
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, "webcontrol")},
-            name="Warema WebControl",
-        )
+        self._attr_unique_id = entity_unique_id(entry_id, "language")
+        self._attr_device_info = device_info
+
+    @property
+    def available(self) -> bool:
+        return self._client.health.available
 
     @property
     def native_value(self):
         code = self._client.language
+        if code is None:
+            return None
         return LANG_MAP.get(code, f"Code {code}")
 
     @property
@@ -37,6 +49,52 @@ class WebControlLanguageSensor(SensorEntity):
         }
 
 
+class WebControlMetricSensor(SensorEntity):
+    """Diagnose-Sensor für eine Kennzahl des Protokoll-Stacks (siehe ``ProtocolMetrics``)."""
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, client, entry_id: str, device_info: DeviceInfo, key: str, name: str, icon: str,
+                 value_fn: Callable[[ProtocolMetrics], Optional[float]],
+                 unit: Optional[str] = None, state_class: SensorStateClass = SensorStateClass.TOTAL_INCREASING):
+        self._client = client
+        self._value_fn = value_fn
+        self._attr_name = name
+        self._attr_icon = icon
+        self._attr_unique_id = entity_unique_id(entry_id, f"metric_{key}")
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._attr_device_info = device_info
+
+    @property
+    def native_value(self):
+        value = self._value_fn(self._client.metrics)
+        return round(value, 2) if isinstance(value, float) else value
+
+
+def _metric_sensors(client, entry_id: str, device_info: DeviceInfo) -> list[WebControlMetricSensor]:
+    ms = UnitOfTime.MILLISECONDS
+    common = (client, entry_id, device_info)
+    return [
+        WebControlMetricSensor(*common, "telegrams", "WebControl Telegramme", "mdi:swap-horizontal",
+                               lambda m: m.sent),
+        WebControlMetricSensor(*common, "retries", "WebControl Wiederholungen", "mdi:replay",
+                               lambda m: m.retries),
+        WebControlMetricSensor(*common, "busy", "WebControl Gateway busy", "mdi:timer-sand",
+                               lambda m: m.busy),
+        WebControlMetricSensor(*common, "counter_mismatch", "WebControl Zählerfehler", "mdi:counter",
+                               lambda m: m.counter_mismatch),
+        WebControlMetricSensor(*common, "errors", "WebControl Verbindungsfehler", "mdi:lan-disconnect",
+                               lambda m: m.errors),
+        WebControlMetricSensor(*common, "rtt_mean", "WebControl Telegramm-Laufzeit", "mdi:timer-outline",
+                               lambda m: m.mean_ms("rtt"), ms, SensorStateClass.MEASUREMENT),
+        WebControlMetricSensor(*common, "parse_mean", "WebControl Parse-Zeit", "mdi:code-tags",
+                               lambda m: m.mean_ms("parse"), ms, SensorStateClass.MEASUREMENT),
+        WebControlMetricSensor(*common, "lock_wait_mean", "WebControl Wartezeit Gateway", "mdi:lock-clock",
+                               lambda m: m.lock_wait.mean_ms, ms, SensorStateClass.MEASUREMENT),
+    ]
+
+
 async def async_setup_entry(hass, entry, async_add_entities):
-    client = hass.data[DOMAIN]["client"]
-    async_add_entities([WebControlLanguageSensor(client)], True)
+    data = hass.data[DOMAIN][entry.entry_id]
+    common = (data["client"], entry.entry_id, data["device_info"])
+    async_add_entities([WebControlLanguageSensor(*common), *_metric_sensors(*common)], True)
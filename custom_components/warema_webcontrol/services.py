@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+from urllib.parse import urlparse
+
+import voluptuous as vol
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.util import dt as dt_util
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+
+from .capture import CaptureWriter
+from .const import DOMAIN, entity_unique_id
+from .webcontrol_client import ChannelInfo, WebControlProtocol
+
+SERVICE_MOVE_COVERS = "move_covers"
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_GET_HISTORY = "get_history"
+ATTR_ACTION = "action"
+ATTR_POSITION = "position"
+ATTR_TILT_POSITION = "tilt_position"
+ATTR_HOURS = "hours"
+
+ACTION_FC = {
+    "open": WebControlProtocol.FC_HOCH,
+    "close": WebControlProtocol.FC_TIEF,
+    "stop": WebControlProtocol.FC_STOP,
+    "set_position": WebControlProtocol.FC_STATE,
+}
+
+MOVE_COVERS_SCHEMA = vol.Schema({
+    vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+    vol.Required(ATTR_ACTION): vol.In(list(ACTION_FC)),
+    vol.Optional(ATTR_POSITION): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+    vol.Optional(ATTR_TILT_POSITION): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+})
+
+GET_HISTORY_SCHEMA = vol.Schema({
+    vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+    vol.Optional(ATTR_HOURS, default=1): vol.All(vol.Coerce(float), vol.Range(min=0, max=24)),
+})
+
+
+def _open_percent(lastp: int | None) -> int | None:
+    """lastp (0=offen, 200=zu) -> HA open%."""
+    return None if lastp is None else max(0, min(100, 100 - round(lastp / 2)))
+
+
+def _iso(t: float) -> str:
+    return dt_util.utc_from_timestamp(t).isoformat(timespec="seconds")
+
+
+def _cover_channels(hass: HomeAssistant, entity_ids: list[str]) -> dict[str, dict[str, ChannelInfo]]:
+    """entry_id -> {entity_id: ChannelInfo} über die unique_id (<entry_id>_webcontrol_cover_<cli>)."""
+    registry = er.async_get(hass)
+    loaded = hass.data.get(DOMAIN, {})
+    by_entry: dict[str, dict[str, ChannelInfo]] = {}
+    for entity_id in entity_ids:
+        entry = registry.async_get(entity_id)
+        prefix = entity_unique_id(entry.config_entry_id, "cover_") if entry is not None else None
+        if entry is None or entry.platform != DOMAIN or not entry.unique_id.startswith(prefix):
+            raise HomeAssistantError(f"{entity_id} ist kein Warema-WebControl-Behang")
+        data = loaded.get(entry.config_entry_id)
+        if data is None:
+            raise HomeAssistantError(f"{entity_id}: Gateway ist nicht geladen")
+        covers = {ch.cli_index: ch for ch in data["mapped"]["cover"]}
+        ch = covers.get(int(entry.unique_id[len(prefix):]))
+        if ch is None:
+            raise HomeAssistantError(f"{entity_id}: Kanal nicht gefunden")
+        by_entry.setdefault(entry.config_entry_id, {})[entity_id] = ch
+    return by_entry
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Gruppen-/Szenenbefehle registrieren."""
+
+    async def _async_move_covers(call: ServiceCall) -> ServiceResponse:
+        if not hass.data.get(DOMAIN):
+            raise HomeAssistantError("Warema WebControl ist nicht geladen")
+        action = call.data[ATTR_ACTION]
+        fc = ACTION_FC[action]
+        pos = 0
+        if action == "set_position":
+            if ATTR_POSITION not in call.data:
+                raise HomeAssistantError("set_position benötigt position")
+            # HA open% -> Gateway closed%
+            pos = 100 - call.data[ATTR_POSITION]
+        tilt = call.data.get(ATTR_TILT_POSITION) if action == "set_position" else None
+        by_entry = _cover_channels(hass, call.data[ATTR_ENTITY_ID])
+
+        def _commands(client, channels):
+            # Position und Lamellenwinkel in einem Telegramm (nur Kanäle mit Winkelbereich)
+            return [
+                (ch, fc, pos, client.tilt_to_winkel(ch, tilt) if tilt is not None and client.supports_tilt(ch)
+                 else WebControlProtocol.INVALID_WINKEL)
+                for ch in channels.values()
+            ]
+
+        # je Gateway ein Batch; verschiedene Gateways laufen parallel
+        clients = {entry_id: hass.data[DOMAIN][entry_id]["client"] for entry_id in by_entry}
+        results = await asyncio.gather(*(
+            clients[entry_id].move_many(_commands(clients[entry_id], channels))
+            for entry_id, channels in by_entry.items()
+        ))
+        response = {"sent": 0, "ok": 0, "failed": []}
+        for channels, result in zip(by_entry.values(), results):
+            failed_clis = set(result["failed"])
+            response["sent"] += result["sent"]
+            response["ok"] += result["ok"]
+            response["failed"] += [entity_id for entity_id, ch in channels.items() if ch.cli_index in failed_clis]
+        return response
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_MOVE_COVERS,
+        _async_move_covers,
+        schema=MOVE_COVERS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_get_history(call: ServiceCall) -> ServiceResponse:
+        """Positionsverlauf aus dem Speicher (Zustandswechsel, 5-min-Buckets, Anzahl Fahrten)."""
+        by_entry = _cover_channels(hass, call.data[ATTR_ENTITY_ID])
+        now = dt_util.utcnow()
+        since = now.timestamp() - call.data[ATTR_HOURS] * 3600
+        midnight = dt_util.start_of_local_day().timestamp()
+        response = {}
+        for entry_id, channels in by_entry.items():
+            coordinator = hass.data[DOMAIN][entry_id]["coordinator"]
+            for entity_id, ch in channels.items():
+                history = coordinator.history.get((ch.raumindex, ch.kanalindex))
+                if history is None:
+                    continue
+                response[entity_id] = {
+                    # [Zeit, open%, lastw, Auslöser]
+                    "samples": [[_iso(x.t), _open_percent(x.lastp), x.lastw, x.cause]
+                                for x in history.samples_since(since)],
+                    # [Beginn, min open%, max open%, letzter open%, Fahrten]
+                    "buckets": [[_iso(b.start), _open_percent(b.max_lastp), _open_percent(b.min_lastp),
+                                 _open_percent(b.last_lastp), b.moves] for b in history.buckets_since(since)],
+                    "moves": history.moves_since(since),
+                    "moves_today": history.moves_since(midnight),
+                }
+        return response
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        _async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def _async_start_capture(call: ServiceCall) -> ServiceResponse:
+        """Mitschnitt aller geladenen Gateways nach <config>/warema_capture_<host>_<zeit>.jsonl.gz."""
+        stamp = dt_util.now().strftime("%Y%m%d-%H%M%S")
+        files = []
+        for data in hass.data.get(DOMAIN, {}).values():
+            client = data["client"]
+            if client.capture is None:
+                host = urlparse(client.base_url).hostname or "gateway"
+                path = hass.config.path(f"warema_capture_{host}_{stamp}.jsonl.gz")
+                client.capture = await hass.async_add_executor_job(
+                    CaptureWriter, path, client.base_url, hass.async_add_executor_job)
+            files.append(client.capture.path)
+        return {"files": files}
+
+    async def _async_stop_capture(call: ServiceCall) -> ServiceResponse:
+        files = []
+        for data in hass.data.get(DOMAIN, {}).values():
+            client = data["client"]
+            capture, client.capture = client.capture, None
+            if capture is not None:
+                await hass.async_add_executor_job(capture.close)
+                files.append({"file": capture.path, "telegrams": capture.count})
+        return {"files": files}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_START_CAPTURE, _async_start_capture, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_STOP_CAPTURE, _async_stop_capture, supports_response=SupportsResponse.OPTIONAL
+    )
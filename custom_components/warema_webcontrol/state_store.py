@@ -0,0 +1,167 @@
+from __future__ import annotations
+import time
+from array import array
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, NamedTuple, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .webcontrol_client import ChannelInfo
+
+ChannelKey = Tuple[int, int]
+
+MISSING = -0x80000000  # Platzhalter für "kein Wert" in den int-Spalten
+DEFAULT_SIZE = 144     # max. Kanäle je Gateway (load_all_channels)
+
+
+class ChannelState(NamedTuple):
+    """Unveränderlicher Zustand eines Kanals (Snapshot für den Coordinator)."""
+    raumindex: Optional[int]
+    kanalindex: Optional[int]
+    lastp: Optional[int]
+    lastw: Optional[int]
+
+
+def _opt(value: int) -> Optional[int]:
+    return None if value == MISSING else value
+
+
+class ChannelStateStore:
+    """Momentanwerte aller Kanäle in festen Arrays, Index = cli-Index.
+
+    Ersetzt ``state_cache``/``cause_cache`` (ein dict je Kanal und Poll).
+    Updates schreiben nur Array-Zellen; ``version`` zählt je Kanal echte
+    Änderungen, damit der Coordinator ohne Vergleich der Werte erkennt,
+    was sich geändert hat. Polls adressieren (raum, kanal); ``bind`` legt
+    die Zuordnung zum cli-Index fest.
+    """
+
+    def __init__(self, size: int = DEFAULT_SIZE):
+        self._keys: Dict[ChannelKey, int] = {}
+        self.lastp = array("i", [MISSING]) * size
+        self.lastw = array("i", [MISSING]) * size
+        self.cause = array("i", [MISSING]) * size
+        self.updated = array("d", [0.0]) * size
+        self.cause_updated = array("d", [0.0]) * size
+        self.version = array("I", [0]) * size
+
+    def _ensure(self, cli: int) -> None:
+        missing = cli + 1 - len(self.version)
+        if missing > 0:
+            self.lastp.extend([MISSING] * missing)
+            self.lastw.extend([MISSING] * missing)
+            self.cause.extend([MISSING] * missing)
+            self.updated.extend([0.0] * missing)
+            self.cause_updated.extend([0.0] * missing)
+            self.version.extend([0] * missing)
+
+    # ---------- Zuordnung ----------
+    def bind(self, channels: Iterable[ChannelInfo]) -> None:
+        """(raum, kanal) -> cli neu aufbauen; Werte bleiben je cli erhalten."""
+        keys: Dict[ChannelKey, int] = {}
+        for ch in channels:
+            if ch.raumindex is not None and ch.kanalindex is not None:
+                self._ensure(ch.cli_index)
+                keys[(ch.raumindex, ch.kanalindex)] = ch.cli_index
+        # neues dict statt Mutation: Snapshots teilen sich die alte Zuordnung
+        self._keys = keys
+
+    def cli_for(self, raumindex: int, kanalindex: int) -> Optional[int]:
+        return self._keys.get((raumindex, kanalindex))
+
+    def clear(self, cli: int) -> None:
+        if cli < len(self.version):
+            self.lastp[cli] = self.lastw[cli] = self.cause[cli] = MISSING
+            self.updated[cli] = self.cause_updated[cli] = 0.0
+            self.version[cli] += 1
+
+    # ---------- Updates aus dem Parser ----------
+    def update(self, raumindex: int, kanalindex: int, lastp: Optional[int], lastw: Optional[int]) -> bool:
+        """lastp/lastw eines Kanals setzen; True, wenn sich etwas geändert hat."""
+        cli = self._keys.get((raumindex, kanalindex))
+        if cli is None:
+            return False
+        return self.update_cli(cli, lastp, lastw)
+
+    def update_cli(self, cli: int, lastp: Optional[int], lastw: Optional[int]) -> bool:
+        """Wie ``update``, adressiert über den cli-Index (Blockabfragen)."""
+        self._ensure(cli)
+        p = MISSING if lastp is None else lastp
+        w = MISSING if lastw is None else lastw
+        self.updated[cli] = time.monotonic()
+        if self.lastp[cli] == p and self.lastw[cli] == w:
+            return False
+        self.lastp[cli] = p
+        self.lastw[cli] = w
+        self.version[cli] += 1
+        return True
+
+    def set_cause(self, cli: int, cause: Optional[int]) -> None:
+        self._ensure(cli)
+        self.cause[cli] = MISSING if cause is None else cause
+        self.cause_updated[cli] = time.monotonic()
+
+    # ---------- Lesen ----------
+    def lastp_at(self, raumindex: int, kanalindex: int) -> Optional[int]:
+        cli = self._keys.get((raumindex, kanalindex))
+        return None if cli is None else _opt(self.lastp[cli])
+
+    def lastw_at(self, raumindex: int, kanalindex: int) -> Optional[int]:
+        cli = self._keys.get((raumindex, kanalindex))
+        return None if cli is None else _opt(self.lastw[cli])
+
+    def cause_of(self, cli: int) -> Optional[int]:
+        return _opt(self.cause[cli]) if cli < len(self.cause) else None
+
+    def cause_age(self, cli: int) -> Optional[float]:
+        """Sekunden seit der letzten Auslöser-Abfrage (None: noch nie gelesen)."""
+        if cli >= len(self.cause_updated) or not self.cause_updated[cli]:
+            return None
+        return time.monotonic() - self.cause_updated[cli]
+
+    def snapshot(self) -> StateSnapshot:
+        return StateSnapshot(self._keys, self.lastp[:], self.lastw[:], self.version[:])
+
+
+class StateSnapshot(Mapping):
+    """Unveränderliche Sicht ``(raum, kanal) -> ChannelState`` auf einen Stand des Stores.
+
+    Kopiert nur die Spalten (je ein memcpy); ``ChannelState`` entsteht erst beim Zugriff.
+    """
+
+    __slots__ = ("_keys", "_lastp", "_lastw", "_version")
+
+    def __init__(self, keys: Dict[ChannelKey, int], lastp: array, lastw: array, version: array):
+        self._keys = keys
+        self._lastp = lastp
+        self._lastw = lastw
+        self._version = version
+
+    def __getitem__(self, key: ChannelKey) -> ChannelState:
+        cli = self._keys[key]
+        if not self._version[cli]:
+            raise KeyError(key)
+        return ChannelState(key[0], key[1], _opt(self._lastp[cli]), _opt(self._lastw[cli]))
+
+    def __iter__(self) -> Iterator[ChannelKey]:
+        version = self._version
+        return (key for key, cli in self._keys.items() if version[cli])
+
+    def __len__(self) -> int:
+        version = self._version
+        return sum(1 for cli in self._keys.values() if version[cli])
+
+    def __eq__(self, other: object) -> bool:
+        # always_update=False vergleicht jeden neuen Snapshot mit dem alten:
+        # Versionszähler statt aller ChannelState-Objekte vergleichen
+        if isinstance(other, StateSnapshot) and other._keys is self._keys:
+            return other._version == self._version
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def changed_since(self, previous: Optional[Mapping]) -> Set[ChannelKey]:
+        """Kanäle, deren Zustand sich gegenüber ``previous`` geändert hat."""
+        if not isinstance(previous, StateSnapshot) or previous._keys is not self._keys:
+            return set(self)
+        old, new = previous._version, self._version
+        return {key for key, cli in self._keys.items() if old[cli] != new[cli]}
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .async_client import AsyncWebControlClient
+from .const import signal_channel_update
+from .coordinator import WebControlCoordinator
+from .state_store import ChannelKey
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StateStream:
+    """Streaming-Modus: ``TEL_POLLING`` reihum mit fester Telegrammrate statt periodischer Sweeps.
+
+    Jede Abfrage wird sofort übernommen; geänderte Kanäle werden einzeln per
+    Dispatcher (``signal_channel_update``) gemeldet. Kanäle in Fahrt bekommen
+    jeden zweiten Slot, sobald sie laut Poll-Scheduler fällig sind, die übrigen
+    Slots gehen reihum an alle Kanäle. Latenz je Kanal ist damit höchstens
+    ``Kanäle / rate`` Sekunden, die Last gleichmäßig.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, client: AsyncWebControlClient,
+                 coordinator: WebControlCoordinator, rate: float):
+        self.hass = hass
+        self.entry = entry
+        self.client = client
+        self.coordinator = coordinator
+        self.interval = 1.0 / max(rate, 0.1)
+        self._cursor = 0
+        self._urgent_turn = True
+
+    @callback
+    def async_start(self) -> None:
+        # Background-Task des Entries: wird beim Entladen abgebrochen
+        self.entry.async_create_background_task(
+            self.hass, self._async_run(), f"warema_webcontrol stream {self.client.base_url}"
+        )
+
+    def _next_key(self, now: float) -> Optional[ChannelKey]:
+        coordinator = self.coordinator
+        self._urgent_turn = not self._urgent_turn
+        if self._urgent_turn:
+            for key in coordinator.poll_scheduler.due(now):
+                if coordinator.wants_poll(key, now):
+                    return key
+        keys = coordinator.channel_keys
+        if not keys:
+            return None
+        key = keys[self._cursor % len(keys)]
+        self._cursor = (self._cursor + 1) % len(keys)
+        return key
+
+    async def _async_run(self) -> None:
+        while True:
+            start = time.monotonic()
+            key = self._next_key(start)
+            if key is not None:
+                try:
+                    await self.client.poll(*key)
+                except Exception as exc:  # Verbindung/Gateway: weiter im Takt, Entities unavailable
+                    self.coordinator.async_stream_failed(exc)
+                else:
+                    for changed in self.coordinator.async_stream_result(key):
+                        async_dispatcher_send(self.hass, signal_channel_update(self.entry.entry_id, *changed))
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - start)))
@@ -3,54 +3,65 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from . import DOMAIN
+from .const import entity_unique_id
 
 class WebControlSwitchAbwesend(SwitchEntity):
-    def __init__(self, client):
+    def __init__(self, client, entry_id: str, device_info: DeviceInfo):
         self._client = client
         self._state = bool(client.abwesend) if client.abwesend is not None else False
         self._attr_name = "Abwesend"
-        self._attr_unique_id = "webcontrol_switch_abwesend"
-        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, "webcontrol")}, name="Warema WebControl")
+        self._attr_unique_id = entity_unique_id(entry_id, "switch_abwesend")
+        self._attr_device_info = device_info
+
+    @property
+    def available(self) -> bool:
+        # offener Circuit (Gateway nicht erreichbar): unavailable statt veralteter Werte
+        return self._client.health.available
 
     @property
     def is_on(self):
         return self._state
 
-    def turn_on(self, **kwargs):
-        res = self._client.set_abwesend(True)
+    async def async_turn_on(self, **kwargs):
+        res = await self._client.set_abwesend(True)
         self._state = True if res is not None else self._state
-        self.schedule_update_ha_state()
+        self.async_write_ha_state()
 
-    def turn_off(self, **kwargs):
-        res = self._client.set_abwesend(False)
+    async def async_turn_off(self, **kwargs):
+        res = await self._client.set_abwesend(False)
         self._state = False if res is not None else self._state
-        self.schedule_update_ha_state()
+        self.async_write_ha_state()
 
 
 class WebControlSwitchAutomatik(SwitchEntity):
-    def __init__(self, client):
+    def __init__(self, client, entry_id: str, device_info: DeviceInfo):
         self._client = client
         self._state = bool(client.automatik) if client.automatik is not None else False
         self._attr_name = "Automatik"
-        self._attr_unique_id = "webcontrol_switch_automatik"
-        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, "webcontrol")}, name="Warema WebControl")
+        self._attr_unique_id = entity_unique_id(entry_id, "switch_automatik")
+        self._attr_device_info = device_info
+
+    @property
+    def available(self) -> bool:
+        return self._client.health.available
 
     @property
     def is_on(self):
         return self._state
 
-    def turn_on(self, **kwargs):
-        res = self._client.set_automatik(True)
+    async def async_turn_on(self, **kwargs):
+        res = await self._client.set_automatik(True)
         self._state = True if res is not None else self._state
-        self.schedule_update_ha_state()
+        self.async_write_ha_state()
 
-    def turn_off(self, **kwargs):
-        res = self._client.set_automatik(False)
+    async def async_turn_off(self, **kwargs):
+        res = await self._client.set_automatik(False)
         self._state = False if res is not None else self._state
-        self.schedule_update_ha_state()
+        self.async_write_ha_state()
 
 
 
 async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities):
-    client = hass.data[DOMAIN]["client"]
-    async_add_entities([WebControlSwitchAbwesend(client), WebControlSwitchAutomatik(client)], True)
\ No newline at end of file
+    data = hass.data[DOMAIN][entry.entry_id]
+    args = (data["client"], entry.entry_id, data["device_info"])
+    async_add_entities([WebControlSwitchAbwesend(*args), WebControlSwitchAutomatik(*args)], True)
\ No newline at end of file
@@ -0,0 +1,24 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+# Befehlszähler 0..255 als Hex, damit pro Telegramm nur noch dieses Byte eingesetzt wird
+COUNTER_HEX: Tuple[str, ...] = tuple(f"{c:02x}" for c in range(256))
+
+
+@lru_cache(maxsize=2048)
+def frame_tail(payload: Tuple[int, ...]) -> str:
+    """Hex von Länge + Payload (alles hinter dem Befehlszähler); je Payload einmal berechnet.
+
+    Polls (je raum/kanal), Auslöser-Abfragen und wiederkehrende Befehle
+    treffen den Cache; nur neue Payloads werden kodiert.
+    """
+    frame = bytearray(len(payload) + 1)
+    frame[0] = len(payload)
+    frame[1:] = bytes(b & 0xFF for b in payload)
+    return frame.hex()
+
+
+def encode_frame(code_hex: str, counter: int, payload: Sequence[int]) -> str:
+    """Kompletter Frame ``[code, counter, len, payload...]`` als Hex-String."""
+    return code_hex + COUNTER_HEX[counter] + frame_tail(tuple(payload))
@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.topology"
+
+
+class TopologyCache:
+    """Persistente Kanal-Liste + Raummatrix je Gateway-URL (.storage/warema_webcontrol.topology).
+
+    Eine gemeinsame Instanz je hass (``DATA_TOPOLOGY_CACHE``), da ``async_save`` den ganzen Store schreibt.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._store: Store[dict] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data: Optional[dict] = None
+
+    async def _async_data(self) -> dict:
+        if self._data is None:
+            loaded = await self._store.async_load() or {}
+            # mehrere Gateways laden parallel: nur das erste Ergebnis übernehmen
+            if self._data is None:
+                self._data = loaded
+        return self._data
+
+    async def async_load(self, base_url: str) -> Optional[dict]:
+        return (await self._async_data()).get(base_url)
+
+    async def async_save(self, base_url: str, topology: dict) -> None:
+        data = await self._async_data()
+        data[base_url] = topology
+        await self._store.async_save(data)
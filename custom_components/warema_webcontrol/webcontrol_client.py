@@ -2,11 +2,24 @@ from __future__ import annotations
 import requests
 import xml.etree.ElementTree as ET
 import time
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from threading import Lock
 
-@dataclass
+from .backoff import AdaptiveBackoff
+from .capture import CaptureWriter, ReplayTransport
+from .health import CircuitBreaker, GatewayUnavailable
+from .metrics import ProtocolMetrics
+from .telegram import encode_frame
+from .state_store import ChannelState, ChannelStateStore  # noqa: F401 (ChannelState: Re-Export)
+
+# Feldtypen der Antwortschemas (Bitmaske)
+_INT = 0
+_STR = 1
+_LIST = 2
+_AUTO = 4
+
+@dataclass(slots=True)
 class ChannelInfo:
     cli_index: int
     name: str
@@ -20,7 +33,15 @@ class ChannelInfo:
     kanalindex: Optional[int] = None
 
 
-class WebControlClient:
+class WebControlProtocol:
+    """Transportunabhängiger Teil des WebControl-Protokolls.
+
+    Enthält Konstanten, Telegramm-Aufbau, XML-Auswertung und die Übernahme
+    der Antworten in Status/Caches. Die eigentliche Übertragung liefern
+    ``WebControlClient`` (requests, blockierend) und
+    ``AsyncWebControlClient`` (aiohttp, asyncio).
+    """
+
     # Header & Limits
     BEFEHLSCODE = 0x90
     BEFEHLSZAEHLER_MAX = 254
@@ -67,29 +88,84 @@ class WebControlClient:
     FC_TIEF = 9
 
     INVALID_WINKEL = 32767
+    MAX_RETRIES = 8  # ~5 s Busy-Budget mit AdaptiveBackoff (0.05 s … 2 s)
     DEF_MAXRAUM = 64
     DEF_MAXKANAL = 10
+    MAX_ROOM_GAP = 4  # leere Räume in Folge, nach denen der Raum-Scan aufgibt
+    CLIMA_BLOCK_SIZE = 4  # Kanäle je TEL_CLIMATRONIC_KANAL_ABFRAGEN
+
+    # Antwortschemas je Request-Telegramm: XML-Tag -> Feldtyp.
+    # Header-Felder (inkl. Busy-Antwort) sind in jedem Schema enthalten.
+    _HEADER_SCHEMA = {"responseID": _INT, "befehlszaehler": _INT, "requestid": _INT, "feedback": _INT}
+    _STATE_SCHEMA = {"raumindex": _INT, "kanalindex": _INT, "lastp": _INT, "lastw": _INT}
+    _schemas: Dict[int, Dict[str, int]] = {
+        TEL_SPRACHE: {**_HEADER_SCHEMA, "sprache": _INT},
+        TEL_CLIMATRONIC_KANAL_ABFRAGEN: {
+            **_HEADER_SCHEMA,
+            "kanalname": _STR | _LIST, "produkttyp": _INT | _LIST,
+            "lastp": _INT | _LIST, "lastw": _INT | _LIST,
+            "maxw": _INT | _LIST, "minw": _INT | _LIST, "winakt": _INT | _LIST,
+        },
+        TEL_SOMMER_WINTER_AKTIV: {**_HEADER_SCHEMA, "winterakt": _INT},
+        TEL_CHECK_CLIMA_DATA: {**_HEADER_SCHEMA, "erfolg": _INT},
+        TEL_RAUM_ABFRAGEN: {**_HEADER_SCHEMA, "raumname": _STR, "clikanalindex": _INT | _LIST},
+        TEL_POLLING: {**_HEADER_SCHEMA, **_STATE_SCHEMA},
+        TEL_KANALBEDIENUNG: {**_HEADER_SCHEMA, **_STATE_SCHEMA},
+        TEL_AUSLOESER: {**_HEADER_SCHEMA, "raumindex": _INT, "kanalindex": _INT, "clikanidx": _INT, "cliausl": _INT},
+        TEL_ABWESEND: _HEADER_SCHEMA,
+        TEL_AUTOMATIK: _HEADER_SCHEMA,
+    }
+    _FALLBACK_SCHEMA: Dict[str, int] = {
+        tag: (kind & _STR) | _AUTO
+        for schema in _schemas.values()
+        for tag, kind in schema.items()
+    }
 
     def __init__(self, base_url: str, timeout: int = 5):
         self.base_url = base_url.rstrip("/")
+        # GET-URL bis auf das Hex-Telegramm vorberechnet (Hex ist URL-sicher)
+        self._url_prefix = f"{self.base_url}/protocol.xml?protocol="
+        self._code_hex = f"{self.BEFEHLSCODE:02x}"
         self.timeout = timeout
         self._counter = 0
         # init status
-        self._lock = Lock()
-        self._session = requests.Session()
         self.language: Optional[int] = None
         self.sommer_winter_aktiv: Optional[int] = None
         self.clima_check_erfolg: Optional[int] = None
         self.abwesend: Optional[bool] = None
         self.automatik: Optional[bool] = None
-        # Ensure caches exist for coordinator
-        self.state_cache: Dict[Tuple[int,int], Dict[str,int]] = {}
-        self.cause_cache: Dict[int, Dict[str,int]] = {}
+        # lastp/lastw/Auslöser je cli (für Coordinator und Entities)
+        self.states = ChannelStateStore()
+        self._command_listeners: List[Callable[[int, int, int, int], None]] = []
+        self.metrics = ProtocolMetrics(
+            {getattr(self, name): name for name in dir(self) if name.startswith("TEL_")}
+        )
+        self.backoff = AdaptiveBackoff()
+        # Verbindungszustand: nach Fehlern in Folge sofort ablehnen statt in den Timeout laufen
+        self.health = CircuitBreaker()
+        # Mitschnitt (CaptureWriter) bzw. Wiedergabe statt HTTP (ReplayTransport), siehe capture.py
+        self.capture: Optional[CaptureWriter] = None
+        self.transport: Optional[ReplayTransport] = None
+
+    def add_command_listener(self, listener: Callable[[int, int, int, int], None]) -> Callable[[], None]:
+        """Listener(raumindex, kanalindex, fc, pos) nach jedem Kanalbefehl; liefert eine Abmeldefunktion."""
+        self._command_listeners.append(listener)
+        return lambda: self._command_listeners.remove(listener)
+
+    def _notify_command(self, raumindex: int, kanalindex: int, fc: int, pos: int) -> None:
+        for listener in list(self._command_listeners):
+            listener(raumindex, kanalindex, fc, pos)
 
     # ---------- low-level helpers ----------
-    @staticmethod
-    def _to_hex(byte_array: List[int]) -> str:
-        return ''.join(f'{b & 0xFF:02x}' for b in byte_array)
+    def _check_health(self) -> None:
+        """Vor jedem Versuch in ``_send``: bei offenem Circuit sofort ``GatewayUnavailable``.
+
+        Bei der Wiedergabe (``transport``) stammen Fehler aus dem Mitschnitt; dort kein Fail-fast.
+        """
+        if self.transport is None and not self.health.allow():
+            raise GatewayUnavailable(
+                f"{self.base_url} nicht erreichbar, nächster Versuch in {self.health.seconds_until_probe():.0f} s"
+            )
 
     def _next_counter(self) -> int:
         c = self._counter
@@ -100,73 +176,52 @@ class WebControlClient:
         if not (1 <= len(payload_bytes) <= self.PAYLOADLENGTH_MAX):
             raise ValueError("Payload-Länge außerhalb des gültigen Bereichs")
         header_counter = self._next_counter()
-        header = [self.BEFEHLSCODE, header_counter, len(payload_bytes)]
-        full = header + payload_bytes
-        return self._to_hex(full), header_counter
+        # Frame ohne Zähler ist je Payload gecacht (telegram.py)
+        return encode_frame(self._code_hex, header_counter, payload_bytes), header_counter
+
+    def _parse_xml_response(self, xml_text: str, tel: Optional[int] = None) -> dict:
+        """Parse Warema WebControl response XML in a single pass over its elements.
 
-    def _parse_xml_response(self, xml_text: str) -> dict:
-        """Parse Warema WebControl reponse XML: extract responseID + lastp (0..200)."""
+        ``tel`` is the request telegram; only the header fields plus the fields
+        of its response schema are decoded (e.g. 4 fields for RES_POLLING).
+        Without ``tel`` every known field is decoded (repeated tags -> list).
+        """
         try:
             root = ET.fromstring(xml_text)
         except ET.ParseError as e:
             return {"ok": False, "error": f"xml_parse_error: {e}"}
 
-        def get_tag(*names: str) -> str | list | None:
-            for n in names:
-                el = root.findall(n)                                
-                ed = []                                           
-                for e in el:                          
-                    if e is not None and e.text is not None:              
-                        ed.append(e.text.strip())   
-                if ed is not None:               
-                    return ed if len(ed) != 1 else ed[0]                      
-            return None                                     
-        
-        xml_tags = {"responseID", 
-                    "befehlszaehler", 
-                    "requestid", 
-                    "feedback", 
-                    "raumindex", 
-                    "kanalindex", 
-                    "lastp", 
-                    "lastw", 
-                    "raumname",
-                    "clikanalindex",
-                    "cliausl",
-                    "erfolg",
-                    "sprache",
-                    "winterakt",
-                    "maxw",
-                    "minw",
-                    "produkttyp",
-                    "kanalname",
-                    "winakt"}        
-        
-        result = {"ok": True }
-
-        for xml_tag in xml_tags:
-            tag = get_tag(xml_tag)
-            if tag is not None:
-                if isinstance(tag, list):
-                    for t in tag:
-                        try:
-                            if xml_tag not in {"kanalname", "raumname"}:
-                                result.setdefault(xml_tag, []).append(int(t))
-                            else:
-                                result.setdefault(xml_tag, []).append(t.strip())
-                        except Exception:
-                            result.setdefault(xml_tag, []).append(None)
+        schema = self._schemas.get(tel, self._FALLBACK_SCHEMA)
+        result = {"ok": True}
+        for el in root:
+            kind = schema.get(el.tag)
+            if kind is None:
+                continue
+            text = el.text
+            if kind & _STR:
+                value = text.strip() if text is not None else ""
+            else:
+                try:
+                    value = int(text)
+                except (TypeError, ValueError):
+                    value = None
+            tag = el.tag
+            if kind & _LIST:
+                lst = result.get(tag)
+                if lst is None:
+                    result[tag] = [value]
+                else:
+                    lst.append(value)
+            elif kind & _AUTO and tag in result:
+                # unbekanntes Telegramm: wiederholtes Tag -> Liste (altes Verhalten)
+                prev = result[tag]
+                if isinstance(prev, list):
+                    prev.append(value)
                 else:
-                    try:
-                        if xml_tag not in {"kanalname", "raumname"}:
-                            result[xml_tag] = int(tag)
-                        else:
-                            result[xml_tag] = tag.strip()
-                    except Exception:
-                        result[xml_tag] = None
+                    result[tag] = [prev, value]
             else:
-                result[xml_tag] = None
-        
+                result.setdefault(tag, value)
+
         if result.get("responseID") is None:
             result["ok"] = False
             result["error"] = "missing or empty befehlszaehler"
@@ -175,69 +230,47 @@ class WebControlClient:
             result["ok"] = False
             result["error"] = "missing or empty befehlszaehler"
 
-        if result.get("responseID") == WebControlClient.RES_CLIMA_COM_BUSY:
+        if result.get("responseID") == self.RES_CLIMA_COM_BUSY:
             result["busy"] = True
         return result
 
-    def _http_get(self, hex_string: str) -> dict:
-        url = f"{self.base_url}/protocol.xml"
-        r = self._session.get(url, params={"protocol": hex_string}, timeout=self.timeout)
-        r.raise_for_status()
-        return self._parse_xml_response(r.text)
+    # ---------- response handling (shared by sync/async clients) ----------
+    def _next_payload(self, payload: List[int], response: dict, cnt: int) -> Optional[List[int]]:
+        """Evaluate one gateway answer inside the retry loop of ``_send``.
 
-    def _send(self, payload: List[int], max_retries: int = 3, backoff_sec: float = 1) -> Tuple(dict, int):
-        """Threadsafe sending + easy busy/counter validation
-        returns the parsed XML response as dict
+        Returns None if the answer is final, otherwise the payload for the
+        next attempt (same payload on counter mismatch, TEL_POLLING while
+        the gateway is busy).
         """
-        with self._lock:
-            poll = False
-            ridx = 0
-            kidx = 0
-            for attempt in range(max_retries):
-                # in polling mode(gateway busy): send poll command
-                if poll:
-                    poll = False
-                    payload = [self.TEL_POLLING, ridx, kidx, 0]
-                    ridx = 0
-                    kidx = 0
-                
-                hex_msg, cnt = self._build_message(payload)
-                response = self._http_get(hex_msg)
-
-                rid = response.get("responseID")
-                cz = response.get("befehlszaehler")
-
-                # Validate counter 
-                if cz is not None and cz != cnt:
-                    # Gateway returned different counter -> try again
-                    time.sleep(backoff_sec)
-                    continue
-
-                if rid == self.RES_CLIMA_COM_BUSY:
-                    if response.get("requestid") == payload[0] and response.get("feedback") == 1:
-                        # Gateway busy, start polling
-                        time.sleep(backoff_sec)
-                        poll = True
-                        if len(payload) >= 1:
-                            if payload[0] == self.TEL_KANALBEDIENUNG and len(payload) >= 3:
-                                ridx = payload[1]
-                                kidx = payload[2]
-                        continue
-
-                # OK
-                return response, cnt
-            # Alle Versuche durch: letztes Response zurückgeben (oder Fehler werfen)
-            return response, cnt
+        rid = response.get("responseID")
+        cz = response.get("befehlszaehler")
+
+        # Validate counter
+        if cz is not None and cz != cnt:
+            # Gateway returned different counter -> try again
+            self.metrics.stats(payload[0]).counter_mismatch += 1
+            return payload
+
+        if rid == self.RES_CLIMA_COM_BUSY:
+            if response.get("requestid") == payload[0] and response.get("feedback") == 1:
+                # Gateway busy, start polling
+                self.metrics.stats(payload[0]).busy += 1
+                ridx = 0
+                kidx = 0
+                if payload[0] == self.TEL_KANALBEDIENUNG and len(payload) >= 3:
+                    ridx = payload[1]
+                    kidx = payload[2]
+                return [self.TEL_POLLING, ridx, kidx, 0]
+
+        # OK
+        return None
 
-    # ---------- single command helpers ----------
-    def set_language_query(self) -> dict:
-        (response, cnt) = self._send([self.TEL_SPRACHE, 255])
+    def _on_language(self, response: dict) -> dict:
         if response.get("ok") and response.get("responseID") == self.RES_SPRACHE:
             self.language = response.get("sprache")
         return response
 
-    def query_clima_block(self, start_index: int) -> List[ChannelInfo]:
-        (response, cnt) = self._send([self.TEL_CLIMATRONIC_KANAL_ABFRAGEN, start_index])
+    def _on_clima_block(self, response: dict, start_index: int) -> List[ChannelInfo]:
         if not response.get("ok") or response.get("responseID") != self.RES_CLIMATRONIC_KANAL_ABFRAGEN:
             return []
         names   = response.get("kanalname", [])
@@ -247,7 +280,7 @@ class WebControlClient:
         maxws   = response.get("maxw", [])
         minws   = response.get("minw", [])
         winakts = response.get("winakt", [])
-        count = min(4, max(len(names), len(types), len(lastps), len(lastws)))
+        count = min(self.CLIMA_BLOCK_SIZE, max(len(names), len(types), len(lastps), len(lastws)))
         channels: List[ChannelInfo] = []
         for i in range(count):
             idx = start_index + i
@@ -263,50 +296,44 @@ class WebControlClient:
             ))
         return channels
 
-    def load_all_channels(self, max_elements: int = 144) -> List[ChannelInfo]:
-        all_channels: List[ChannelInfo] = []
-        for start in range(0, max_elements, 4):
-            block = self.query_clima_block(start)
-            if not block:
-                break
-            all_channels.extend(block)
-        return all_channels
-
-    def query_sommer_winter_aktiv(self) -> dict:
-        (response, cnt) = self._send([self.TEL_SOMMER_WINTER_AKTIV])
+    def _on_sommer_winter(self, response: dict) -> dict:
         if response.get("ok") and response.get("responseID") == self.RES_SOMMER_WINTER_AKTIV:
             winter = response.get("winterakt")
             self.sommer_winter_aktiv = winter if winter is not None else None
         return response
 
-    def check_clima_data(self) -> dict:
-        (response, cnt) = self._send([self.TEL_CHECK_CLIMA_DATA])
+    def _on_check_clima(self, response: dict) -> dict:
         if response.get("ok") and response.get("responseID") == self.RES_CHECK_CLIMA_DATA:
             erfolg = response.get("erfolg")
             self.clima_check_erfolg = erfolg if erfolg is not None else None
         return response
 
-    def load_rooms_matrix(self, max_rooms: int = DEF_MAXRAUM) -> Dict[int, Tuple[int,int]]:
-        mapping: Dict[int, Tuple[int,int]] = {}
-        for r in range(0, max_rooms):
-            (response, cnt) = self._send([self.TEL_RAUM_ABFRAGEN, r])
-            if not response.get("ok") or response.get("responseID") != self.RES_RAUM_ABFRAGEN:
-                break
-            raumname = response.get("raumname", "")
-            if not raumname:
-                break
-            clis = response.get("clikanalindex", [])
-            for k, cli in enumerate(clis[:self.DEF_MAXKANAL]):
-                if cli != self.TYPE_INVALID:  # gültig
-                    mapping[cli] = (r, k)
-        return mapping
-
-    def initialize(self, max_elements: int = 144) -> dict:
-        self.set_language_query()
-        channels = self.load_all_channels(max_elements)
-        self.query_sommer_winter_aktiv()
-        self.check_clima_data()
-        cli_to_roomchan = self.load_rooms_matrix()
+    def _on_room(self, response: dict, raumindex: int, mapping: Dict[int, Tuple[int,int]]) -> bool:
+        """Add one TEL_RAUM_ABFRAGEN answer to ``mapping``; False ends the room scan."""
+        if not response.get("ok") or response.get("responseID") != self.RES_RAUM_ABFRAGEN:
+            return False
+        raumname = response.get("raumname", "")
+        if not raumname:
+            return False
+        clis = response.get("clikanalindex", [])
+        for k, cli in enumerate(clis[:self.DEF_MAXKANAL]):
+            if cli != self.TYPE_INVALID:  # gültig
+                mapping[cli] = (raumindex, k)
+        return True
+
+    def _expected_clis(self, channels: List[ChannelInfo]) -> Set[int]:
+        """cli-Indizes, die einem Raum zugeordnet sein müssen (gültige Kanäle)."""
+        return {ch.cli_index for ch in channels if ch.type != self.TYPE_INVALID}
+
+    def _room_scan_done(self, exists: bool, missing: Optional[Set[int]], gap: int) -> bool:
+        """Abbruch des Raum-Scans: ohne ``missing`` am ersten leeren Raum, sonst
+        sobald alle erwarteten cli zugeordnet sind (Lücken bis ``MAX_ROOM_GAP``)."""
+        if missing is None:
+            return not exists
+        return not missing or gap >= self.MAX_ROOM_GAP
+
+    def map_channels(self, channels: List[ChannelInfo], cli_to_roomchan: Dict[int, Tuple[int,int]]) -> dict:
+        """Räume zuordnen und Kanäle nach Plattform (cover/light) gruppieren (Ergebnis wie ``initialize``)."""
         valid = [ch for ch in channels if ch.type != self.TYPE_INVALID]
         for ch in valid:
             if ch.cli_index in cli_to_roomchan:
@@ -317,6 +344,7 @@ class WebControlClient:
             "cover":  [ch for ch in valid if ch.type in cover_types and ch.raumindex is not None],
             "light":  [ch for ch in valid if ch.type in light_types and ch.raumindex is not None],
         }
+        self.states.bind(valid)
         return {
             "language": self.language,
             "sommer_winter_aktiv": self.sommer_winter_aktiv,
@@ -324,60 +352,268 @@ class WebControlClient:
             "channels_all": channels,
             "channels_valid": valid,
             "channels_mapped": mapped,
+            "rooms": cli_to_roomchan,
         }
-    
-    # ---------- Polling ----------
-    def poll(self, raumindex: int, kanalindex: int) -> Tuple(dict, int):
-        (response, cnt) = self._send([self.TEL_POLLING, raumindex, kanalindex, 0])
 
-        st = {
-            "raumindex": response.get("raumindex"),
-            "kanalindex": response.get("kanalindex"),
-            "lastp": response.get("lastp"),
-            "lastw": response.get("lastw")
+    # ---------- Topologie (Kanal-Liste + Raummatrix) ----------
+    def export_topology(self, init: dict) -> dict:
+        """JSON-fähige Topologie aus einem ``initialize``-Ergebnis."""
+        return {
+            "clima_check_erfolg": init.get("clima_check_erfolg"),
+            "channels": [asdict(ch) for ch in init["channels_all"]],
+            "rooms": {str(cli): list(rk) for cli, rk in init["rooms"].items()},
         }
-        self.state_cache[(raumindex, kanalindex)] = st
-        return (response, cnt)
 
-    # ---------- Auslöser ----------
-    def read_ausloeser(self, raumindex: int, kanalindex: int, cli_index: int) -> Optional[Dict[str,int]]:
-        (response, cnt) = self._send([self.TEL_AUSLOESER, raumindex, kanalindex, cli_index])
-        if not response.get("ok") and response.get("responseID") != self.RES_AUSLOESER:
+    @staticmethod
+    def topology_channels(topology: dict) -> Tuple[List[ChannelInfo], Dict[int, Tuple[int,int]]]:
+        """Gegenstück zu ``export_topology``: Kanäle + cli->(raum, kanal)."""
+        channels = [ChannelInfo(**data) for data in topology.get("channels", [])]
+        rooms = {int(cli): (rk[0], rk[1]) for cli, rk in topology.get("rooms", {}).items()}
+        return channels, rooms
+
+    @staticmethod
+    def channel_signature(ch: Optional[ChannelInfo]) -> Optional[tuple]:
+        """Topologie-relevante Felder eines Kanals (ohne Momentanwerte)."""
+        if ch is None:
             return None
-        
-        data = {
-            "raumindex": response.get("raumindex"),
-            "kanalindex": response.get("kanalindex"),
-            "clikanidx": response.get("clikanidx"),
-            "cliausl": response.get("cliausl")
-        }
-        self.cause_cache[cli_index] = data
-        return data
-    
-    # Bedienungen
-    def _channel_command(self, raumindex: int, kanalindex: int, fc: int, pos: int, winkel: int) -> dict:
+        return (ch.name, ch.type, ch.maxw, ch.minw)
+
+    def _on_poll(self, response: dict, raumindex: int, kanalindex: int) -> bool:
+        return self.states.update(raumindex, kanalindex, response.get("lastp"), response.get("lastw"))
+
+    def _on_state_block(self, response: dict, start_index: int) -> List[int]:
+        """lastp/lastw eines Kanalblocks in den State-Store übernehmen; liefert die cli-Indizes."""
+        clis: List[int] = []
+        for ch in self._on_clima_block(response, start_index):
+            if ch.type != self.TYPE_INVALID and ch.lastp is not None:
+                self.states.update_cli(ch.cli_index, ch.lastp, ch.lastw)
+                clis.append(ch.cli_index)
+        return clis
+
+    def _on_ausloeser(self, response: dict, cli_index: int) -> Optional[int]:
+        if not response.get("ok") or response.get("responseID") != self.RES_AUSLOESER:
+            return None
+        cause = response.get("cliausl")
+        self.states.set_cause(cli_index, cause)
+        return cause
+
+    def _channel_payload(self, raumindex: int, kanalindex: int, fc: int, pos: int, winkel: int) -> List[int]:
         if winkel != self.INVALID_WINKEL and winkel < 0:
             winkel = (65535 + winkel + 1)
         hi = (winkel - (winkel % 256)) // 256
         lo = winkel % 256
-        (response, cnt) = self._send([self.TEL_KANALBEDIENUNG, raumindex, kanalindex, fc, pos, hi, lo])
-
-        if response.get("ok") and response.get("responseID") == self.RES_KANALBEDIENUNG:
-            # Aktualisiere Cache
-            st = {
-                "raumindex": response.get("raumindex"),
-                "kanalindex": response.get("kanalindex"),
-                "lastp": response.get("lastp"),
-                "lastw": response.get("lastw")
-            }
-            self.state_cache[(response.get("raumindex"), response.get("kanalindex"))] = st
+        return [self.TEL_KANALBEDIENUNG, raumindex, kanalindex, fc, pos, hi, lo]
 
+    # ---------- Lamellenwinkel (Raffstore/Jalousie) ----------
+    # Annahme analog lastp (0 = offen, 200 = zu): maxw = Lamellen zu, minw = ganz offen.
+    def supports_tilt(self, ch: ChannelInfo) -> bool:
+        return (ch.type in (self.TYPE_RAFFSTORE, self.TYPE_JALOUSIE)
+                and ch.minw is not None and ch.maxw is not None and ch.maxw != ch.minw)
+
+    def tilt_to_winkel(self, ch: ChannelInfo, percent: int) -> int:
+        """HA-Tilt in % (0 = zu, 100 = offen) -> Winkel zwischen minw und maxw."""
+        percent = max(0, min(100, percent))
+        return round(ch.maxw - (ch.maxw - ch.minw) * percent / 100)
+
+    def winkel_to_tilt(self, ch: ChannelInfo, winkel: Optional[int]) -> Optional[int]:
+        if winkel is None or not self.supports_tilt(ch):
+            return None
+        return max(0, min(100, round((ch.maxw - winkel) * 100 / (ch.maxw - ch.minw))))
+
+    def _current_percent(self, ch: ChannelInfo) -> int:
+        """Aktuelle Position (closed%) für reine Winkelbefehle, die die Position beibehalten."""
+        lastp = self.states.lastp_at(ch.raumindex, ch.kanalindex)
+        if lastp is None:
+            raise ValueError(f"Position von Kanal {ch.cli_index} unbekannt")
+        return round(lastp / 2)
+
+    def _command_accepted(self, response: dict) -> bool:
+        """Kanalbefehl vom Gateway angenommen (nicht busy/abgelehnt, Retries nicht erschöpft)."""
+        return bool(response.get("ok")) and response.get("responseID") == self.RES_KANALBEDIENUNG
+
+    def _on_channel_command(self, response: dict) -> dict:
+        if self._command_accepted(response):
+            # Aktualisiere Zustand
+            self.states.update(response.get("raumindex"), response.get("kanalindex"),
+                               response.get("lastp"), response.get("lastw"))
         return response
 
-    def cover_set_position(self, ch: ChannelInfo, percent: int) -> dict:
+    def _on_abwesend(self, response: dict, enabled: bool) -> Optional[bool]:
+        if response.get("ok") and response.get("responseID") == self.RES_ABWESEND:
+            self.abwesend = enabled
+            return self.abwesend
+        return None
+
+    def _on_automatik(self, response: dict, enabled: bool) -> Optional[bool]:
+        if response.get("ok") and response.get("responseID") == self.RES_AUTOMATIK:
+            self.automatik = enabled
+            return self.automatik
+        return None
+
+
+class WebControlClient(WebControlProtocol):
+    """Blockierender Client (requests), z. B. für Skripte und Tests ohne Event-Loop."""
+
+    def __init__(self, base_url: str, timeout: int = 5):
+        super().__init__(base_url, timeout)
+        self._lock = Lock()
+        self._session = requests.Session()
+
+    def _http_get(self, hex_string: str, tel: Optional[int] = None) -> dict:
+        stats = self.metrics.stats(tel)
+        stats.sent += 1
+        start = time.perf_counter()
+        try:
+            if self.transport is not None:
+                text = self.transport.fetch(hex_string)
+            else:
+                r = self._session.get(self._url_prefix + hex_string, timeout=self.timeout)
+                r.raise_for_status()
+                text = r.text
+        except Exception as exc:
+            stats.errors += 1
+            self.health.record_failure()
+            if self.capture is not None:
+                self.capture.record(hex_string, None, time.perf_counter() - start, str(exc) or type(exc).__name__)
+            raise
+        self.health.record_success()
+        parse_start = time.perf_counter()
+        stats.rtt.add(parse_start - start)
+        if self.capture is not None:
+            self.capture.record(hex_string, text, parse_start - start)
+        result = self._parse_xml_response(text, tel)
+        stats.parse.add(time.perf_counter() - parse_start)
+        return result
+
+    def _send(self, payload: List[int], max_retries: int = WebControlProtocol.MAX_RETRIES) -> Tuple[dict, int]:
+        """Threadsafe sending + easy busy/counter validation
+        returns the parsed XML response as dict
+
+        Der Lock gilt je Versuch; während der Backoff-Pause können andere
+        Threads ihre Telegramme senden.
+        """
+        tel = payload[0]
+        delay: Optional[float] = None
+        busy_since: Optional[float] = None
+        for attempt in range(max_retries):
+            wait_start = time.perf_counter()
+            with self._lock:
+                self.metrics.lock_wait.add(time.perf_counter() - wait_start)
+                self._check_health()
+                hex_msg, cnt = self._build_message(payload)
+                response = self._http_get(hex_msg, payload[0])
+            next_payload = self._next_payload(payload, response, cnt)
+            if next_payload is None:
+                if busy_since is not None:
+                    self.backoff.observe_busy(tel, time.monotonic() - busy_since)
+                return response, cnt
+            self.metrics.stats(payload[0]).retries += 1
+            if response.get("busy"):
+                busy_since = busy_since or time.monotonic()
+                delay = self.backoff.next_delay(tel, delay)
+            else:
+                delay = self.backoff.min_delay
+            payload = next_payload
+            time.sleep(delay)
+        # Alle Versuche durch: letztes Response zurückgeben (oder Fehler werfen)
+        return response, cnt
+
+    # ---------- single command helpers ----------
+    def set_language_query(self) -> dict:
+        (response, cnt) = self._send([self.TEL_SPRACHE, 255])
+        return self._on_language(response)
+
+    def query_clima_block(self, start_index: int) -> List[ChannelInfo]:
+        (response, cnt) = self._send([self.TEL_CLIMATRONIC_KANAL_ABFRAGEN, start_index])
+        return self._on_clima_block(response, start_index)
+
+    def load_all_channels(self, max_elements: int = 144) -> List[ChannelInfo]:
+        all_channels: List[ChannelInfo] = []
+        for start in range(0, max_elements, self.CLIMA_BLOCK_SIZE):
+            block = self.query_clima_block(start)
+            if not block:
+                break
+            all_channels.extend(block)
+        return all_channels
+
+    def query_sommer_winter_aktiv(self) -> dict:
+        (response, cnt) = self._send([self.TEL_SOMMER_WINTER_AKTIV])
+        return self._on_sommer_winter(response)
+
+    def check_clima_data(self) -> dict:
+        (response, cnt) = self._send([self.TEL_CHECK_CLIMA_DATA])
+        return self._on_check_clima(response)
+
+    def load_rooms_matrix(self, max_rooms: int = WebControlProtocol.DEF_MAXRAUM,
+                          expected: Optional[Set[int]] = None) -> Dict[int, Tuple[int,int]]:
+        """cli -> (raum, kanal); mit ``expected`` Abbruch, sobald alle diese cli gefunden sind."""
+        mapping: Dict[int, Tuple[int,int]] = {}
+        missing = set(expected) if expected is not None else None
+        gap = 0
+        for r in range(0, max_rooms):
+            if missing is not None and not missing:
+                break
+            (response, cnt) = self._send([self.TEL_RAUM_ABFRAGEN, r])
+            exists = self._on_room(response, r, mapping)
+            gap = 0 if exists else gap + 1
+            if missing is not None:
+                missing -= mapping.keys()
+            if self._room_scan_done(exists, missing, gap):
+                break
+        return mapping
+
+    def discover(self, max_elements: int = 144) -> Tuple[List[ChannelInfo], Dict[int, Tuple[int,int]]]:
+        channels = self.load_all_channels(max_elements)
+        self.query_sommer_winter_aktiv()
+        self.check_clima_data()
+        cli_to_roomchan = self.load_rooms_matrix(expected=self._expected_clis(channels))
+        return channels, cli_to_roomchan
+
+    def initialize(self, max_elements: int = 144) -> dict:
+        self.set_language_query()
+        channels, cli_to_roomchan = self.discover(max_elements)
+        return self.map_channels(channels, cli_to_roomchan)
+
+    def initialize_from_topology(self, topology: dict) -> dict:
+        """Wie ``initialize``, aber Kanäle/Räume aus einer gespeicherten Topologie."""
+        self.set_language_query()
+        self.query_sommer_winter_aktiv()
+        channels, cli_to_roomchan = self.topology_channels(topology)
+        return self.map_channels(channels, cli_to_roomchan)
+
+    # ---------- Polling ----------
+    def poll(self, raumindex: int, kanalindex: int) -> Tuple[dict, int]:
+        (response, cnt) = self._send([self.TEL_POLLING, raumindex, kanalindex, 0])
+        self._on_poll(response, raumindex, kanalindex)
+        return (response, cnt)
+
+    def poll_block(self, start_index: int) -> List[int]:
+        """Zustand von bis zu vier Kanälen ab ``start_index`` mit einem Telegramm lesen."""
+        (response, cnt) = self._send([self.TEL_CLIMATRONIC_KANAL_ABFRAGEN, start_index])
+        return self._on_state_block(response, start_index)
+
+    # ---------- Auslöser ----------
+    def read_ausloeser(self, raumindex: int, kanalindex: int, cli_index: int) -> Optional[int]:
+        (response, cnt) = self._send([self.TEL_AUSLOESER, raumindex, kanalindex, cli_index])
+        return self._on_ausloeser(response, cli_index)
+
+    # Bedienungen
+    def _channel_command(self, raumindex: int, kanalindex: int, fc: int, pos: int, winkel: int) -> dict:
+        (response, cnt) = self._send(self._channel_payload(raumindex, kanalindex, fc, pos, winkel))
+        if self._command_accepted(response):
+            self._notify_command(raumindex, kanalindex, fc, pos)
+        return self._on_channel_command(response)
+
+    def cover_set_position(self, ch: ChannelInfo, percent: int, winkel: int = WebControlProtocol.INVALID_WINKEL) -> dict:
         if ch.raumindex is not None and ch.kanalindex is not None:
             self.read_ausloeser(ch.raumindex, ch.kanalindex, ch.cli_index)
-        return self._channel_command(ch.raumindex, ch.kanalindex, self.FC_STATE, int(percent), self.INVALID_WINKEL)
+        return self._channel_command(ch.raumindex, ch.kanalindex, self.FC_STATE, int(percent), winkel)
+
+    def cover_set_tilt(self, ch: ChannelInfo, winkel: int, percent: Optional[int] = None) -> dict:
+        """Lamellenwinkel: FC_STATE mit ``percent`` bzw. der aktuellen Position."""
+        if percent is None:
+            percent = self._current_percent(ch)
+        return self._channel_command(ch.raumindex, ch.kanalindex, self.FC_STATE, percent, winkel)
 
     def cover_open(self, ch: ChannelInfo) -> dict:
         if ch.raumindex is not None and ch.kanalindex is not None:
@@ -404,14 +640,8 @@ class WebControlClient:
     def set_abwesend(self, enabled: bool) -> Optional[bool]:
         # Annahme: TEL_ABWESEND mit Parameter 1/0
         (response, cnt) = self._send([self.TEL_ABWESEND, 1 if enabled else 0])
-        if response.get("ok") and response.get("responseID") == self.RES_ABWESEND:
-            self.abwesend = enabled
-            return self.abwesend
-        return None
+        return self._on_abwesend(response, enabled)
 
     def set_automatik(self, enabled: bool) -> Optional[bool]:
         (response, cnt) = self._send([self.TEL_AUTOMATIK, 1 if enabled else 0])
-        if response.get("ok") and response.get("responseID") == self.RES_AUTOMATIK:
-            self.automatik = enabled
-            return self.automatik
-        return None
+        return self._on_automatik(response, enabled)
@@ -0,0 +1,74 @@
+"""Options-Flow: Registrierung am ConfigFlow und Übernahme der Optionen."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant  # vor loader (zirkulärer Import)
+from homeassistant import loader
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.data_entry_flow import FlowResultType
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.warema_webcontrol.config_flow import WebControlConfigFlow  # noqa: E402
+from custom_components.warema_webcontrol.const import (  # noqa: E402
+    CONF_BASE_URL,
+    CONF_DEFERRED_START,
+    CONF_SCAN_INTERVAL,
+    CONF_STREAM_RATE,
+    CONF_STREAMING,
+    DOMAIN,
+)
+
+
+def _entry() -> ConfigEntry:
+    return ConfigEntry(
+        version=WebControlConfigFlow.VERSION,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Warema WebControl (gateway)",
+        data={CONF_BASE_URL: "http://gateway", CONF_SCAN_INTERVAL: 30},
+        source="user",
+        options={},
+        unique_id="http://gateway",
+    )
+
+
+async def _run_options_flow(config_dir: Path, user_input: dict) -> ConfigEntry:
+    # custom_components wird über sys.path (ROOT) gefunden, .storage landet in config_dir
+    hass = HomeAssistant(str(config_dir))
+    loader.async_setup(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    entry = _entry()
+    # wie MockConfigEntry.add_to_hass: Eintrag ohne Setup (kein Gateway nötig)
+    hass.config_entries._entries[entry.entry_id] = entry
+    try:
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        assert result["type"] == FlowResultType.FORM
+        assert result["step_id"] == "init"
+        result = await hass.config_entries.options.async_configure(result["flow_id"], user_input)
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        return entry
+    finally:
+        await hass.async_stop(force=True)
+
+
+def test_options_flow_registered():
+    assert WebControlConfigFlow.async_supports_options_flow(_entry())
+
+
+def test_options_flow_sets_deferred_start(tmp_path):
+    entry = asyncio.run(_run_options_flow(tmp_path, {
+        CONF_SCAN_INTERVAL: 15,
+        CONF_STREAMING: True,
+        CONF_STREAM_RATE: 10,
+        CONF_DEFERRED_START: True,
+    }))
+    assert entry.options[CONF_DEFERRED_START] is True
+    assert entry.options[CONF_STREAMING] is True
+    assert entry.options[CONF_STREAM_RATE] == 10
+    assert entry.options[CONF_SCAN_INTERVAL] == 15